@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Concurrent OpenAI probes covering both API check scripts"""
+import asyncio
+import os
+from typing import List, Optional, Sequence, Tuple
+import httpx
+from openai import AsyncOpenAI
+
+# The prompts of test_api_simple.py and simple_test.py as (prompt, max_tokens)
+PROBES = (
+    ("Say hello", 5),
+    ("Say 'Hello, API is working!'", 10),
+)
+
+
+async def _probe(client: AsyncOpenAI, prompt: str, max_tokens: int) -> str:
+    """Send one short chat completion and return its text."""
+    response = await client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content
+
+
+async def probe_many(prompts: Sequence[Tuple[str, int]], api_key: Optional[str] = None) -> List[str]:
+    """Run several (prompt, max_tokens) probes concurrently on one async client.
+
+    The calls overlap, so checking several prompts costs about one round trip.
+    Results are returned in the same order as ``prompts``.
+    """
+    http_client = httpx.AsyncClient(http2=True, timeout=30)
+    async with AsyncOpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'), http_client=http_client) as client:
+        return await asyncio.gather(*[_probe(client, prompt, max_tokens) for prompt, max_tokens in prompts])
+
+
+def run_all(api_key: Optional[str] = None) -> List[str]:
+    """Send every probe in PROBES concurrently and return the responses in order."""
+    return asyncio.run(probe_many(PROBES, api_key))
+
+
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    try:
+        for (prompt, _), response in zip(PROBES, run_all()):
+            print(f"✅ {prompt!r}: {response}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
@@ -1,10 +1,35 @@
+import os
 from flask import Flask
+from flask_compress import Compress
+from jinja2 import FileSystemBytecodeCache
 from config import Config
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Jinja already keeps compiled templates in memory per process; the on-disk
+    # bytecode cache lets restarts and new workers skip recompiling them. It lives
+    # in the app's instance folder rather than the shared system temp directory.
+    bytecode_dir = os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(bytecode_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+    
+    # Compress HTML and JSON responses on the way out
+    Compress(app)
+    
+    # One OpenAI client per app, reused by every analyzer
+    from app.services.symptom_analyzer import init_openai
+    init_openai(app)
+    
+    # Build the analyzer the routes use up front when serving in production. Gunicorn
+    # does not preload the app (see gunicorn.conf.py), so this only moves the cost
+    # from each worker's first request to its start-up; nothing is shared between workers
+    if app.config.get('PRELOAD_ANALYZER'):
+        from app.services.simple_analyzer import get_analyzer
+        with app.app_context():
+            get_analyzer()
+    
     # Register blueprints
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
@@ -3,6 +3,37 @@ from wtforms import TextAreaField, SubmitField, SelectField, IntegerField, Strin
 from wtforms.validators import DataRequired, Length, ValidationError, NumberRange, Optional
 import re
 
+# Literal markup tokens are checked with plain substring tests; only the
+# event-handler attribute (onclick=, onload=, etc.) needs the regex engine.
+# Both are matched against lowercased input, so no IGNORECASE folding is needed.
+_SUSPICIOUS_TOKENS = ('<script', 'javascript:', '<iframe', '<object', '<embed')
+_ON_ATTR_RE = re.compile(r'on\w+\s*=')
+
+def validate_symptom_text(text):
+    """Clean and screen a free-text symptom description.
+    
+    Returns a ``(cleaned_text, error_message)`` pair where exactly one is None.
+    """
+    # Remove extra whitespace and check actual content length; the index route
+    # has no form validators, so both bounds apply to the cleaned text here
+    # (str.split() strips and collapses whitespace in a single pass)
+    cleaned_text = ' '.join(text.split())
+    
+    length = len(cleaned_text)
+    if length < 10:
+        return None, 'Please provide at least 10 meaningful characters describing your symptoms.'
+    if length > 2000:
+        return None, 'Please provide between 10 and 2000 characters.'
+    
+    # Basic sanitization check - reject if contains suspicious patterns
+    lowered = text.lower()
+    if any(token in lowered for token in _SUSPICIOUS_TOKENS):
+        return None, 'Invalid characters detected in input.'
+    if 'on' in lowered and '=' in lowered and _ON_ATTR_RE.search(lowered):
+        return None, 'Invalid characters detected in input.'
+    
+    return cleaned_text, None
+
 class SymptomForm(FlaskForm):
     """Enhanced form for symptom input with additional medical information."""
     
@@ -104,25 +135,9 @@ class SymptomForm(FlaskForm):
     
     def validate_symptoms(self, field):
         """Enhanced validation for symptom input."""
-        # Remove extra whitespace and check actual content length
-        cleaned_text = re.sub(r'\s+', ' ', field.data.strip())
-        
-        if len(cleaned_text) < 10:
-            raise ValidationError('Please provide at least 10 meaningful characters describing your symptoms.')
-        
-        # Basic sanitization check - reject if contains suspicious patterns
-        suspicious_patterns = [
-            r'<script',
-            r'javascript:',
-            r'on\w+\s*=',  # onclick, onload, etc.
-            r'<iframe',
-            r'<object',
-            r'<embed'
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, field.data, re.IGNORECASE):
-                raise ValidationError('Invalid characters detected in input.')
+        cleaned_text, error = validate_symptom_text(field.data)
+        if error:
+            raise ValidationError(error)
         
         # Store cleaned text back to field
         field.data = cleaned_text
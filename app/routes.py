@@ -1,27 +1,39 @@
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify
-from app.services.simple_analyzer import SymptomAnalyzer
+import json
+import logging
+from flask import Blueprint, current_app, render_template, request
+from app.forms import validate_symptom_text
+from app.services.simple_analyzer import get_analyzer
 
 bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
+
+# The health payload never changes, so it is serialized once at import
+_HEALTH_RESPONSE_BODY = json.dumps(
+    {'status': 'healthy', 'service': 'Healthcare Symptom Checker'}
+).encode('utf-8')
+
+# Endpoints whose responses do not vary per request, mapped to Cache-Control max-age
+_CACHEABLE_ENDPOINTS = {
+    'main.health_check': 10,
+}
 
 @bp.route('/', methods=['GET', 'POST'])
 def index():
     """Simple symptom input and analysis."""
     if request.method == 'POST':
-        symptoms = request.form.get('symptoms', '').strip()
+        symptoms, error_message = validate_symptom_text(request.form.get('symptoms', ''))
+        if error_message:
+            return render_template('simple_index.html', error=error_message)
         
-        if symptoms and len(symptoms) >= 10:
-            try:
-                analyzer = SymptomAnalyzer()
-                analysis_result = analyzer.analyze_symptoms(symptoms)
-                
-                return render_template('simple_results.html', 
-                                     symptoms=symptoms, 
-                                     analysis=analysis_result)
-            except Exception as e:
-                error_message = f"Error analyzing symptoms: {str(e)}"
-                return render_template('simple_index.html', error=error_message)
-        else:
-            error_message = "Please provide at least 10 characters describing your symptoms."
+        try:
+            analysis_result = get_analyzer().analyze_symptoms(symptoms)
+            
+            return render_template('simple_results.html', 
+                                 symptoms=symptoms, 
+                                 analysis=analysis_result)
+        except Exception as e:
+            logger.error("Symptom analysis failed: %s", e)
+            error_message = f"Error analyzing symptoms: {str(e)}"
             return render_template('simple_index.html', error=error_message)
     
     return render_template('simple_index.html')
@@ -29,4 +41,15 @@ def index():
 @bp.route('/health')
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'service': 'Healthcare Symptom Checker'})
\ No newline at end of file
+    return current_app.response_class(_HEALTH_RESPONSE_BODY, mimetype='application/json')
+
+@bp.after_request
+def add_cache_headers(response):
+    """Let clients and proxies cache static responses and revalidate via ETag."""
+    max_age = _CACHEABLE_ENDPOINTS.get(request.endpoint)
+    if max_age is not None and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.add_etag()
+        response.make_conditional(request)
+    return response
\ No newline at end of file
@@ -1 +1,15 @@
-# Services package
\ No newline at end of file
+# Services package
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .symptom_analyzer import SymptomAnalyzer
+
+__all__ = ['SymptomAnalyzer']
+
+
+def __getattr__(name):
+    # Import the analyzer (and the OpenAI SDK behind it) on first access only
+    if name == 'SymptomAnalyzer':
+        from .symptom_analyzer import SymptomAnalyzer
+        return SymptomAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
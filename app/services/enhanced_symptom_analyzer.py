@@ -9,22 +9,82 @@ Version: 2.0.0
 License: MIT
 """
 
+import asyncio
 import json
 import logging
+import logging.handlers
+import atexit
+import queue
 import hashlib
+import secrets
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
+from dataclasses import dataclass, replace
 from enum import Enum
 import re
+import sys
 from functools import wraps
 import threading
-from collections import defaultdict
+from collections import defaultdict, deque
+import itertools
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from flask import current_app
 
+from app.services.openai_client import get_client, http_limits
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(text: str) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to compact JSON, matching orjson output when falling back to json."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _iso_from_ns(timestamp_ns: int) -> str:
+    """Format an epoch timestamp in nanoseconds as an ISO 8601 UTC string."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+
+class _LazyIsoTimestamp:
+    """Epoch-nanosecond timestamp that is only formatted when rendered into a log line."""
+    
+    __slots__ = ('timestamp_ns',)
+    
+    def __init__(self, timestamp_ns: int):
+        self.timestamp_ns = timestamp_ns
+    
+    def __str__(self) -> str:
+        return _iso_from_ns(self.timestamp_ns)
+    
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+
+# Slotted dataclasses drop the per-instance __dict__; slots=True needs Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Async OpenAI clients shared across analyzer instances, keyed by event loop id, API
+# key digest and timeout. httpx binds an async pool to the loop it first runs on, so
+# each loop gets its own client; the loop is kept with its client so the id stays
+# unique until the entry is dropped. Sync clients come from openai_client.get_client.
+_CLIENT_CACHE: Dict[Tuple[int, str, float], Tuple[asyncio.AbstractEventLoop, AsyncOpenAI]] = {}
+_CLIENT_LOCK = threading.Lock()
+
 
 class AnalysisStatus(Enum):
     """Analysis status enumeration."""
@@ -45,20 +105,87 @@ class EmergencyLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Ordering used to pick the most severe detected level
+EMERGENCY_SEVERITY = {
+    EmergencyLevel.NONE: 0,
+    EmergencyLevel.LOW: 1,
+    EmergencyLevel.MEDIUM: 2,
+    EmergencyLevel.HIGH: 3,
+    EmergencyLevel.CRITICAL: 4,
+}
+
+# Input screening pattern, compiled once at import
+_SUSPICIOUS_INPUT_RE = re.compile(
+    r'<script|javascript:|<iframe|<object|sql\s*injection|union\s+select|drop\s+table',
+    re.IGNORECASE
+)
+
+# Start of the conditions array in a (possibly partial) streamed AI response
+_CONDITIONS_ARRAY_RE = re.compile(r'"conditions"\s*:\s*\[')
+
+# Phrase patterns for emergency detection, compiled once at import
+_EMERGENCY_REGEX_PATTERNS = (
+    (EmergencyLevel.CRITICAL, re.compile(r'\b(sudden|severe|intense|excruciating)\s+(chest|heart|breathing)')),
+    (EmergencyLevel.HIGH, re.compile(r'\b(can\'t|cannot)\s+(breathe|breath|move|speak)')),
+    (EmergencyLevel.MEDIUM, re.compile(r'\b(severe|intense)\s+(pain|headache|bleeding)')),
+)
+
+# Fixed system message sent with every analysis request, built once at import
+_SYSTEM_PROMPT = """You are a professional medical information assistant designed to provide educational health information. You must:
+
+CORE RESPONSIBILITIES:
+1. Analyze symptoms and suggest possible conditions with medical accuracy
+2. Provide educational information, never medical diagnoses
+3. Always emphasize professional medical consultation
+4. Include appropriate medical disclaimers
+5. Assess symptom severity and urgency
+
+RESPONSE FORMAT:
+Provide a valid JSON response with this exact structure:
+{
+    "conditions": [
+        {
+            "name": "Condition Name",
+            "description": "Detailed medical description",
+            "probability": "High|Medium|Low",
+            "recommendations": ["Specific action 1", "Specific action 2"],
+            "severity": "mild|moderate|severe",
+            "icd_code": "ICD-10 code if applicable"
+        }
+    ],
+    "general_recommendations": ["Professional advice 1", "Professional advice 2"],
+    "disclaimers": ["Medical disclaimer 1", "Medical disclaimer 2"],
+    "confidence_score": 0.85,
+    "urgency_level": "routine|urgent|emergency"
+}
+
+SAFETY REQUIREMENTS:
+- Always include prominent medical disclaimers
+- Emphasize this is NOT a medical diagnosis
+- Recommend consulting healthcare professionals
+- For serious symptoms, strongly recommend immediate medical attention
+- Include confidence scoring for transparency"""
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class AnalysisMetrics:
     """Metrics for analysis performance tracking."""
     request_id: str
-    timestamp: datetime
+    timestamp: int  # epoch nanoseconds
     processing_time_ms: int
     status: AnalysisStatus
     emergency_level: EmergencyLevel
     token_usage: Optional[int] = None
     cache_hit: bool = False
     error_type: Optional[str] = None
+    
+    @property
+    def iso_timestamp(self) -> str:
+        return _iso_from_ns(self.timestamp)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MedicalCondition:
     """Structured medical condition representation."""
     name: str
@@ -69,7 +196,7 @@ class MedicalCondition:
     severity: str = "medium"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class AnalysisResult:
     """Comprehensive analysis result structure."""
     request_id: str
@@ -81,95 +208,204 @@ class AnalysisResult:
     disclaimers: List[str]
     confidence_score: float
     processing_time_ms: int
-    timestamp: datetime
+    timestamp: int  # epoch nanoseconds
     metadata: Dict[str, Any]
+    
+    @property
+    def iso_timestamp(self) -> str:
+        return _iso_from_ns(self.timestamp)
+
+
+# Constant parts of every error result; the shared sequences are tuples so no caller can
+# mutate them, and each error result gets its own list copies
+_ERROR_RESULT_TEMPLATE = AnalysisResult(
+    request_id='',
+    status=AnalysisStatus.API_ERROR,
+    conditions=(),
+    emergency_detected=False,
+    emergency_level=EmergencyLevel.NONE,
+    general_recommendations=('Professional medical consultation recommended',),
+    disclaimers=('Service temporarily unavailable',),
+    confidence_score=0.0,
+    processing_time_ms=0,
+    timestamp=0,
+    metadata={}
+)
 
 
 class SymptomCache:
-    """Thread-safe caching system for symptom analyses."""
+    """
+    Thread-safe lazy-LRU caching system for symptom analyses.
+    
+    Cache hits only stamp a recency ordinal and never take the lock. The cache
+    is allowed to grow to twice ``max_size`` before the least recently used
+    half is evicted in a single pass, keeping puts amortized O(1).
+    """
     
     def __init__(self, max_size: int = 1000, ttl_hours: int = 24):
         self.max_size = max_size
-        self.ttl = timedelta(hours=ttl_hours)
-        self._cache = {}
-        self._access_times = {}
-        self._lock = threading.RLock()
+        self.ttl_seconds = ttl_hours * 3600
+        self._cache: Dict[bytes, AnalysisResult] = {}
+        # key -> (recency ordinal, last access time from time.monotonic())
+        self._recency: Dict[bytes, Tuple[int, float]] = {}
+        self._clock = itertools.count()
+        self._lock = threading.Lock()
     
-    def _generate_key(self, symptoms: str) -> str:
-        """Generate cache key from symptoms."""
-        normalized = re.sub(r'\s+', ' ', symptoms.lower().strip())
-        return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+    @property
+    def size(self) -> int:
+        """Number of cached analyses."""
+        return len(self._cache)
     
-    def get(self, symptoms: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached analysis if available and valid."""
-        with self._lock:
-            key = self._generate_key(symptoms)
-            if key not in self._cache:
-                return None
-            
-            entry_time = self._access_times.get(key)
-            if entry_time and datetime.utcnow() - entry_time > self.ttl:
-                del self._cache[key]
-                del self._access_times[key]
-                return None
-            
-            self._access_times[key] = datetime.utcnow()
-            return self._cache[key]
+    @staticmethod
+    def key_for(symptoms_bytes: bytes) -> bytes:
+        """Generate cache key from UTF-8 encoded, already-normalized symptom text."""
+        # The key only indexes the cache, so a fast 64-bit BLAKE2b digest is enough
+        return hashlib.blake2b(symptoms_bytes, digest_size=8).digest()
+    
+    def get(self, key: bytes, now: Optional[float] = None) -> Optional[AnalysisResult]:
+        """Retrieve cached analysis for a key from :meth:`key_for` if available and valid."""
+        result = self._cache.get(key)
+        if result is None:
+            return None
+        
+        if now is None:
+            now = time.monotonic()
+        recency = self._recency.get(key)
+        if recency is not None and now - recency[1] > self.ttl_seconds:
+            with self._lock:
+                self._cache.pop(key, None)
+                self._recency.pop(key, None)
+            return None
+        
+        # Single dict assignments are atomic under the GIL, so hits stay lock-free
+        self._recency[key] = (next(self._clock), now)
+        return result
     
-    def set(self, symptoms: str, result: Dict[str, Any]) -> None:
-        """Cache analysis result."""
+    def set(self, key: bytes, result: AnalysisResult, now: Optional[float] = None) -> None:
+        """Cache analysis result under a key from :meth:`key_for`."""
+        if now is None:
+            now = time.monotonic()
         with self._lock:
-            key = self._generate_key(symptoms)
-            
-            # Implement LRU eviction if cache is full
-            if len(self._cache) >= self.max_size:
-                oldest_key = min(self._access_times.keys(), 
-                               key=lambda k: self._access_times[k])
-                del self._cache[oldest_key]
-                del self._access_times[oldest_key]
-            
             self._cache[key] = result
-            self._access_times[key] = datetime.utcnow()
+            self._recency[key] = (next(self._clock), now)
+            
+            if len(self._cache) >= 2 * self.max_size:
+                self._evict()
+    
+    def _evict(self) -> None:
+        """Keep only the ``max_size`` most recently used entries. Caller holds the lock."""
+        recency = self._recency
+        keep = sorted(self._cache, key=lambda k: recency.get(k, (-1,))[0], reverse=True)[:self.max_size]
+        self._cache = {k: self._cache[k] for k in keep}
+        self._recency = {k: recency[k] for k in keep if k in recency}
 
 
 class MetricsCollector:
     """Collects and manages application metrics."""
     
+    BUCKET_SECONDS = 300
+    WINDOW_BUCKETS = 288  # 24 hours of 5-minute buckets
+    
+    _FIELDS = ('count', 'processing_ms', 'cache_hits', 'emergencies')
+    
     def __init__(self):
-        self._metrics = []
+        # Per-5-minute aggregates, oldest first
+        self._buckets: deque = deque(maxlen=self.WINDOW_BUCKETS)
+        # Running totals over the buckets currently held, so get_stats() never iterates
+        self._window = dict.fromkeys(self._FIELDS, 0)
         self._lock = threading.RLock()
         self._counters = defaultdict(int)
+        self._total_requests = 0
+    
+    def _drop_oldest(self) -> None:
+        """Remove the oldest bucket and its contribution to the window totals."""
+        expired = self._buckets.popleft()
+        for field in self._FIELDS:
+            self._window[field] -= expired[field]
+    
+    def _expire(self, oldest_id: int) -> None:
+        """Drop buckets at or before ``oldest_id``."""
+        while self._buckets and self._buckets[0]['id'] <= oldest_id:
+            self._drop_oldest()
+    
+    def _bucket_for(self, bucket_id: int) -> Optional[Dict[str, int]]:
+        """Return the aggregate bucket for ``bucket_id``, creating it if needed.
+        
+        Returns None for a record older than every bucket in a full window.
+        """
+        position = len(self._buckets)
+        for bucket in reversed(self._buckets):
+            if bucket['id'] == bucket_id:
+                return bucket
+            if bucket['id'] < bucket_id:
+                break
+            position -= 1
+        
+        bucket = {'id': bucket_id, 'count': 0, 'processing_ms': 0, 'cache_hits': 0, 'emergencies': 0}
+        if len(self._buckets) < self.WINDOW_BUCKETS:
+            self._buckets.insert(position, bucket)
+        elif position > 0:
+            self._drop_oldest()
+            self._buckets.insert(position - 1, bucket)
+        else:
+            return None
+        return bucket
     
     def record_analysis(self, metrics: AnalysisMetrics) -> None:
-        """Record analysis metrics."""
+        """Record analysis metrics. Values are copied out, so callers may reuse ``metrics``."""
+        bucket_id = metrics.timestamp // (self.BUCKET_SECONDS * 1_000_000_000)
+        values = (
+            1,
+            metrics.processing_time_ms,
+            int(metrics.cache_hit),
+            int(metrics.emergency_level != EmergencyLevel.NONE),
+        )
         with self._lock:
-            self._metrics.append(metrics)
+            bucket = self._bucket_for(bucket_id)
+            if bucket is not None:
+                for field, value in zip(self._FIELDS, values):
+                    bucket[field] += value
+                    self._window[field] += value
+            
+            self._total_requests += 1
             self._counters[f"status_{metrics.status.value}"] += 1
             self._counters[f"emergency_{metrics.emergency_level.value}"] += 1
-            
-            # Keep only last 10000 metrics
-            if len(self._metrics) > 10000:
-                self._metrics = self._metrics[-5000:]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get aggregated statistics."""
         with self._lock:
-            if not self._metrics:
+            if not self._total_requests:
                 return {}
             
-            recent_metrics = [m for m in self._metrics 
-                            if datetime.utcnow() - m.timestamp < timedelta(hours=24)]
+            self._expire(int(time.time() // self.BUCKET_SECONDS) - self.WINDOW_BUCKETS)
+            window = self._window
+            recent_count = window['count']
             
             return {
-                "total_requests": len(self._metrics),
-                "requests_24h": len(recent_metrics),
-                "avg_processing_time_ms": sum(m.processing_time_ms for m in recent_metrics) / len(recent_metrics) if recent_metrics else 0,
-                "cache_hit_rate": sum(1 for m in recent_metrics if m.cache_hit) / len(recent_metrics) if recent_metrics else 0,
+                "total_requests": self._total_requests,
+                "requests_24h": recent_count,
+                "avg_processing_time_ms": window['processing_ms'] / recent_count if recent_count else 0,
+                "cache_hit_rate": window['cache_hits'] / recent_count if recent_count else 0,
                 "status_distribution": dict(self._counters),
-                "emergency_cases_24h": sum(1 for m in recent_metrics if m.emergency_level != EmergencyLevel.NONE)
+                "emergency_cases_24h": window['emergencies']
             }
 
 
+class _DropOldestQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that discards the oldest record instead of blocking when full."""
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
 def performance_monitor(func):
     """Decorator to monitor function performance."""
     @wraps(func)
@@ -207,15 +443,24 @@ class EnhancedSymptomAnalyzer:
     - Confidence scoring
     """
     
+    SYSTEM_METRICS_TTL_SECONDS = 1.0
+    
     def __init__(self):
         """Initialize the enhanced symptom analyzer."""
         self.client: Optional[OpenAI] = None
+        # (API key, key digest, timeout) for creating async clients per event loop
+        self._async_client_config: Optional[Tuple[str, str, float]] = None
         self.cache = SymptomCache()
         self.metrics = MetricsCollector()
+        # Per-thread AnalysisMetrics reused for every record_analysis() call
+        self._metrics_carrier = threading.local()
+        # (monotonic time, snapshot) of the last get_system_metrics() result
+        self._system_metrics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         self.logger = self._setup_logging()
         
         # Emergency detection patterns
         self.emergency_patterns = self._load_emergency_patterns()
+        self._keyword_levels, self._emergency_keyword_re = self._compile_emergency_keywords()
         
         # Initialize OpenAI client
         self._initialize_client()
@@ -232,7 +477,15 @@ class EnhancedSymptomAnalyzer:
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
             handler.setFormatter(formatter)
-            logger.addHandler(handler)
+            
+            # Handler I/O (including emergency case logging) runs on a background
+            # thread so a slow stream never adds latency to an analysis request
+            log_queue: queue.Queue = queue.Queue(maxsize=10000)
+            listener = logging.handlers.QueueListener(log_queue, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            
+            logger.addHandler(_DropOldestQueueHandler(log_queue))
             logger.setLevel(logging.INFO)
         
         return logger
@@ -249,10 +502,11 @@ class EnhancedSymptomAnalyzer:
                 self.logger.warning("Invalid OpenAI API key format detected")
                 return
             
-            self.client = OpenAI(
-                api_key=api_key,
-                timeout=current_app.config.get('API_TIMEOUT', 30),
-                max_retries=3
+            timeout = current_app.config.get('API_TIMEOUT', 30)
+            # with_options copies the client but keeps the shared connection pool
+            self.client = get_client(api_key, timeout).with_options(max_retries=3)
+            self._async_client_config = (
+                api_key, hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16], timeout
             )
             
             self.logger.info("OpenAI client initialized successfully")
@@ -260,6 +514,31 @@ class EnhancedSymptomAnalyzer:
         except Exception as e:
             self.logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             self.client = None
+            self._async_client_config = None
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async client for the running event loop, creating it on first use.
+        
+        Callers that run a fresh loop per call (asyncio.run, async_to_sync) get a
+        client bound to that loop instead of one whose loop has already closed.
+        """
+        api_key, key_digest, timeout = self._async_client_config
+        loop = asyncio.get_running_loop()
+        cache_key = (id(loop), key_digest, timeout)
+        with _CLIENT_LOCK:
+            # Clients of closed loops can no longer be used
+            for stale_key in [k for k, (owner, _) in _CLIENT_CACHE.items() if owner.is_closed()]:
+                del _CLIENT_CACHE[stale_key]
+            
+            entry = _CLIENT_CACHE.get(cache_key)
+            if entry is None:
+                entry = _CLIENT_CACHE[cache_key] = (loop, AsyncOpenAI(
+                    api_key=api_key,
+                    timeout=timeout,
+                    max_retries=3,
+                    http_client=httpx.AsyncClient(http2=True, limits=http_limits())
+                ))
+        return entry[1]
     
     def _load_emergency_patterns(self) -> Dict[EmergencyLevel, List[str]]:
         """Load emergency detection patterns by severity."""
@@ -284,6 +563,19 @@ class EnhancedSymptomAnalyzer:
             ]
         }
     
+    def _compile_emergency_keywords(self) -> Tuple[Dict[str, EmergencyLevel], 're.Pattern[str]']:
+        """Build a keyword -> level map and one regex that finds every keyword in a single scan."""
+        keyword_levels = {}
+        for level, keywords in self.emergency_patterns.items():
+            for keyword in keywords:
+                current = keyword_levels.get(keyword)
+                if current is None or EMERGENCY_SEVERITY[level] > EMERGENCY_SEVERITY[current]:
+                    keyword_levels[keyword] = level
+        
+        # Longest keywords first; the lookahead lets overlapping keywords all be reported
+        alternation = '|'.join(re.escape(k) for k in sorted(keyword_levels, key=len, reverse=True))
+        return keyword_levels, re.compile(f'(?=({alternation}))')
+    
     @performance_monitor
     def analyze_symptoms(self, symptoms: str, user_context: Optional[Dict[str, Any]] = None) -> AnalysisResult:
         """
@@ -298,57 +590,70 @@ class EnhancedSymptomAnalyzer:
         """
         request_id = self._generate_request_id()
         start_time = time.time()
+        now = time.monotonic()
         
         try:
-            # Input validation
-            validation_result = self._validate_input(symptoms)
-            if not validation_result.is_valid:
-                return self._create_error_result(
-                    request_id, AnalysisStatus.INVALID_INPUT, 
-                    validation_result.error_message, start_time
-                )
-            
-            # Check cache first
-            cached_result = self.cache.get(symptoms)
-            if cached_result:
-                self.logger.info(f"Cache hit for request {request_id}")
-                cached_result['request_id'] = request_id
-                cached_result['cache_hit'] = True
-                return AnalysisResult(**cached_result)
-            
-            # Detect emergency symptoms
-            emergency_level = self._detect_emergency_symptoms(symptoms)
+            early_result, emergency_level, symptoms_norm, cache_key = self._prepare_analysis(
+                symptoms, request_id, start_time, now
+            )
+            if early_result is not None:
+                return early_result
             
             # Perform analysis
             if not self.client:
                 status = AnalysisStatus.DEMO_MODE
-                analysis_data = self._get_demo_response(symptoms, emergency_level)
+                analysis_data = self._get_demo_response(symptoms_norm, emergency_level)
             else:
                 try:
                     analysis_data = self._perform_ai_analysis(symptoms, user_context)
                     status = AnalysisStatus.SUCCESS
                 except Exception as e:
-                    self.logger.error(f"AI analysis failed: {str(e)}")
-                    if "quota" in str(e).lower() or "billing" in str(e).lower():
-                        status = AnalysisStatus.QUOTA_EXCEEDED
-                        analysis_data = self._get_quota_error_response(symptoms, emergency_level)
-                    else:
-                        status = AnalysisStatus.API_ERROR
-                        analysis_data = self._get_error_response(symptoms, emergency_level, str(e))
+                    status, analysis_data = self._handle_ai_failure(e, symptoms, emergency_level)
             
-            # Create result
-            result = self._create_analysis_result(
-                request_id, status, analysis_data, emergency_level, start_time
+            return self._complete_analysis(
+                request_id, status, analysis_data, emergency_level, start_time, cache_key, now
             )
             
-            # Cache successful results
-            if status == AnalysisStatus.SUCCESS:
-                self.cache.set(symptoms, asdict(result))
+        except Exception as e:
+            self.logger.error(f"Unexpected error in analysis: {str(e)}")
+            return self._create_error_result(
+                request_id, AnalysisStatus.API_ERROR, str(e), start_time
+            )
+    
+    async def analyze_symptoms_async(self, symptoms: str,
+                                     user_context: Optional[Dict[str, Any]] = None) -> AnalysisResult:
+        """
+        Asynchronous variant of :meth:`analyze_symptoms`.
+        
+        The OpenAI request is awaited on an async client, so concurrent analyses
+        share the network wait instead of each blocking a worker. Each event loop
+        gets its own client, so this also works from Flask async views and other
+        callers that start a new loop per request.
+        """
+        request_id = self._generate_request_id()
+        start_time = time.time()
+        now = time.monotonic()
+        
+        try:
+            early_result, emergency_level, symptoms_norm, cache_key = self._prepare_analysis(
+                symptoms, request_id, start_time, now
+            )
+            if early_result is not None:
+                return early_result
             
-            # Record metrics
-            self._record_metrics(result)
+            if not self._async_client_config:
+                status = AnalysisStatus.DEMO_MODE
+                analysis_data = self._get_demo_response(symptoms_norm, emergency_level)
+            else:
+                try:
+                    analysis_data = await self._perform_ai_analysis_async(symptoms, user_context)
+                    status = AnalysisStatus.SUCCESS
+                except Exception as e:
+                    status, analysis_data = self._handle_ai_failure(e, symptoms, emergency_level)
             
-            return result
+            return self._complete_analysis(
+                request_id, status, analysis_data, emergency_level, start_time, cache_key, now
+            )
             
         except Exception as e:
             self.logger.error(f"Unexpected error in analysis: {str(e)}")
@@ -356,124 +661,217 @@ class EnhancedSymptomAnalyzer:
                 request_id, AnalysisStatus.API_ERROR, str(e), start_time
             )
     
+    def _prepare_analysis(self, symptoms: str, request_id: str, start_time: float,
+                          now: float) -> Tuple[Optional[AnalysisResult], EmergencyLevel, str, bytes]:
+        """Consult the cache and validate input before any AI call.
+        
+        Returns a finished result when no AI call is needed, otherwise the
+        detected emergency level, along with the normalized symptom text and
+        its cache key.
+        """
+        # Lowercase and collapse whitespace once for cache, emergency and demo lookups
+        symptoms_norm = ' '.join(symptoms.lower().split()) if symptoms else ''
+        # Encoded once and shared by the cache key and emergency log hash
+        symptoms_bytes = symptoms_norm.encode('utf-8')
+        cache_key = self.cache.key_for(symptoms_bytes)
+        
+        # Check cache first; entries only come from validated input, so a hit skips
+        # validation. The raw length bound still applies since padding normalizes away.
+        if symptoms_norm and len(symptoms) <= 2000:
+            cached_result = self.cache.get(cache_key, now)
+            if cached_result:
+                self.logger.info(f"Cache hit for request {request_id}")
+                # Cached results are shared, so hand out a shallow copy tagged for this request
+                result = replace(
+                    cached_result,
+                    request_id=request_id,
+                    timestamp=time.time_ns(),
+                    processing_time_ms=int((time.time() - start_time) * 1000),
+                    metadata={**cached_result.metadata, 'cache_hit': True}
+                )
+                self._record_metrics(result)
+                return result, EmergencyLevel.NONE, symptoms_norm, cache_key
+        
+        # Input validation
+        validation_result = self._validate_input(symptoms)
+        if not validation_result.is_valid:
+            return self._create_error_result(
+                request_id, AnalysisStatus.INVALID_INPUT, 
+                validation_result.error_message, start_time
+            ), EmergencyLevel.NONE, '', cache_key
+        
+        # Detect emergency symptoms
+        emergency_level = self._detect_emergency_symptoms(symptoms_norm, symptoms_bytes)
+        return None, emergency_level, symptoms_norm, cache_key
+    
+    def _handle_ai_failure(self, error: Exception, symptoms: str,
+                           emergency_level: EmergencyLevel) -> Tuple[AnalysisStatus, Dict[str, Any]]:
+        """Map an AI call failure to a status and fallback response."""
+        self.logger.error(f"AI analysis failed: {str(error)}")
+        if "quota" in str(error).lower() or "billing" in str(error).lower():
+            return AnalysisStatus.QUOTA_EXCEEDED, self._get_quota_error_response(symptoms, emergency_level)
+        return AnalysisStatus.API_ERROR, self._get_error_response(symptoms, emergency_level, str(error))
+    
+    def _complete_analysis(self, request_id: str, status: AnalysisStatus, analysis_data: Dict[str, Any],
+                           emergency_level: EmergencyLevel, start_time: float, cache_key: bytes,
+                           now: float) -> AnalysisResult:
+        """Build the result, cache it if successful and record metrics."""
+        # Create result
+        result = self._create_analysis_result(
+            request_id, status, analysis_data, emergency_level, start_time
+        )
+        
+        # Cache successful results
+        if status == AnalysisStatus.SUCCESS:
+            self.cache.set(cache_key, result, now)
+        
+        # Record metrics
+        self._record_metrics(result)
+        
+        return result
+    
     def _validate_input(self, symptoms: str) -> 'ValidationResult':
         """Validate symptom input."""
         if not symptoms or not symptoms.strip():
-            return ValidationResult(False, "Symptom description cannot be empty")
+            return _EMPTY_INPUT
         
         if len(symptoms.strip()) < 10:
-            return ValidationResult(False, "Please provide at least 10 characters describing your symptoms")
+            return _TOO_SHORT_INPUT
         
         if len(symptoms) > 2000:
-            return ValidationResult(False, "Symptom description is too long (maximum 2000 characters)")
+            return _TOO_LONG_INPUT
         
         # Check for suspicious content
-        suspicious_patterns = [
-            r'<script', r'javascript:', r'<iframe', r'<object',
-            r'sql\s*injection', r'union\s+select', r'drop\s+table'
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, symptoms, re.IGNORECASE):
-                return ValidationResult(False, "Invalid characters detected in input")
+        if _SUSPICIOUS_INPUT_RE.search(symptoms):
+            return _SUSPICIOUS_INPUT
         
-        return ValidationResult(True, "")
+        return _VALID_INPUT
     
-    def _detect_emergency_symptoms(self, symptoms: str) -> EmergencyLevel:
-        """Advanced emergency symptom detection with severity classification."""
-        symptoms_lower = symptoms.lower()
+    def _detect_emergency_symptoms(self, symptoms_norm: str,
+                                   symptoms_bytes: Optional[bytes] = None) -> EmergencyLevel:
+        """Advanced emergency symptom detection with severity classification.
+        
+        Expects symptom text already lowercased and whitespace-normalized;
+        ``symptoms_bytes`` is its UTF-8 encoding when the caller already has it.
+        """
         detected_level = EmergencyLevel.NONE
-        detected_keywords = []
         
-        # Check each emergency level
-        for level, keywords in self.emergency_patterns.items():
-            for keyword in keywords:
-                if keyword in symptoms_lower:
-                    detected_keywords.append(keyword)
-                    if level.value > detected_level.value:
-                        detected_level = level
+        # Keyword detection in a single pass over the text
+        detected_keywords = list(dict.fromkeys(
+            match.group(1) for match in self._emergency_keyword_re.finditer(symptoms_norm)
+        ))
+        for keyword in detected_keywords:
+            level = self._keyword_levels[keyword]
+            if EMERGENCY_SEVERITY[level] > EMERGENCY_SEVERITY[detected_level]:
+                detected_level = level
         
         # Pattern-based detection
-        emergency_regex_patterns = [
-            (EmergencyLevel.CRITICAL, r'\b(sudden|severe|intense|excruciating)\s+(chest|heart|breathing)'),
-            (EmergencyLevel.HIGH, r'\b(can\'t|cannot)\s+(breathe|breath|move|speak)'),
-            (EmergencyLevel.MEDIUM, r'\b(severe|intense)\s+(pain|headache|bleeding)'),
-        ]
-        
-        for level, pattern in emergency_regex_patterns:
-            if re.search(pattern, symptoms_lower):
-                detected_keywords.append(f"pattern: {pattern}")
-                if level.value > detected_level.value:
+        for level, pattern in _EMERGENCY_REGEX_PATTERNS:
+            if pattern.search(symptoms_norm):
+                detected_keywords.append(f"pattern: {pattern.pattern}")
+                if EMERGENCY_SEVERITY[level] > EMERGENCY_SEVERITY[detected_level]:
                     detected_level = level
         
         if detected_keywords:
-            self.logger.warning(f"Emergency symptoms detected (Level: {detected_level.value}): {detected_keywords}")
-            self._log_emergency_case(symptoms, detected_keywords, detected_level)
+            self.logger.warning(
+                "Emergency symptoms detected (Level: %s): %s", detected_level.value, detected_keywords
+            )
+            self._log_emergency_case(
+                symptoms_bytes if symptoms_bytes is not None else symptoms_norm,
+                detected_keywords, detected_level
+            )
         
         return detected_level
     
     def _perform_ai_analysis(self, symptoms: str, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Perform AI-powered symptom analysis."""
-        system_prompt = self._build_enhanced_system_prompt()
-        user_prompt = self._build_enhanced_user_prompt(symptoms, user_context)
-        
         response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.2,
-            top_p=0.9,
-            frequency_penalty=0.1,
-            presence_penalty=0.1
+            **self._build_completion_request(symptoms, user_context)
         )
         
         return self._parse_ai_response(response.choices[0].message.content)
     
-    def _build_enhanced_system_prompt(self) -> str:
-        """Build enhanced system prompt for AI analysis."""
-        return """You are a professional medical information assistant designed to provide educational health information. You must:
-
-CORE RESPONSIBILITIES:
-1. Analyze symptoms and suggest possible conditions with medical accuracy
-2. Provide educational information, never medical diagnoses
-3. Always emphasize professional medical consultation
-4. Include appropriate medical disclaimers
-5. Assess symptom severity and urgency
-
-RESPONSE FORMAT:
-Provide a valid JSON response with this exact structure:
-{
-    "conditions": [
-        {
-            "name": "Condition Name",
-            "description": "Detailed medical description",
-            "probability": "High|Medium|Low",
-            "recommendations": ["Specific action 1", "Specific action 2"],
-            "severity": "mild|moderate|severe",
-            "icd_code": "ICD-10 code if applicable"
+    async def _perform_ai_analysis_async(self, symptoms: str,
+                                         user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Perform AI-powered symptom analysis on the async client."""
+        response = await self._get_async_client().chat.completions.create(
+            **self._build_completion_request(symptoms, user_context)
+        )
+        
+        return self._parse_ai_response(response.choices[0].message.content)
+    
+    def stream_conditions(self, symptoms: str,
+                          user_context: Optional[Dict[str, Any]] = None) -> Iterator[MedicalCondition]:
+        """
+        Stream the AI analysis and yield conditions as soon as each one is complete.
+        
+        The response is requested with ``stream=True`` and the ``conditions``
+        array is decoded incrementally, so only the condition currently being
+        received is held in memory. Yields nothing when no client is configured.
+        """
+        if not self.client:
+            return
+        
+        stream = self.client.chat.completions.create(
+            stream=True, **self._build_completion_request(symptoms, user_context)
+        )
+        decoder = json.JSONDecoder()
+        buffer = ''
+        in_conditions = False
+        
+        try:
+            for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                buffer += chunk.choices[0].delta.content
+                
+                if not in_conditions:
+                    match = _CONDITIONS_ARRAY_RE.search(buffer)
+                    if not match:
+                        continue
+                    buffer = buffer[match.end():]
+                    in_conditions = True
+                
+                while True:
+                    buffer = buffer.lstrip(' \t\r\n,')
+                    if not buffer:
+                        break
+                    if buffer[0] == ']':
+                        return
+                    try:
+                        cond_data, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        # Object not fully received yet
+                        break
+                    buffer = buffer[end:]
+                    if isinstance(cond_data, dict):
+                        yield self._build_medical_condition(cond_data)
+        finally:
+            stream.close()
+    
+    def _build_completion_request(self, symptoms: str,
+                                  user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the chat completion arguments shared by the sync and async paths."""
+        user_prompt = self._build_enhanced_user_prompt(symptoms, user_context)
+        
+        return {
+            'model': "gpt-3.5-turbo",
+            'messages': [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": user_prompt}
+            ],
+            'max_tokens': 2000,
+            'temperature': 0.2,
+            'top_p': 0.9,
+            'frequency_penalty': 0.1,
+            'presence_penalty': 0.1
         }
-    ],
-    "general_recommendations": ["Professional advice 1", "Professional advice 2"],
-    "disclaimers": ["Medical disclaimer 1", "Medical disclaimer 2"],
-    "confidence_score": 0.85,
-    "urgency_level": "routine|urgent|emergency"
-}
-
-SAFETY REQUIREMENTS:
-- Always include prominent medical disclaimers
-- Emphasize this is NOT a medical diagnosis
-- Recommend consulting healthcare professionals
-- For serious symptoms, strongly recommend immediate medical attention
-- Include confidence scoring for transparency"""
     
     def _build_enhanced_user_prompt(self, symptoms: str, user_context: Optional[Dict[str, Any]] = None) -> str:
         """Build enhanced user prompt with context."""
         context_info = ""
         if user_context:
-            context_info = f"\nUser Context: {json.dumps(user_context)}"
+            context_info = f"\nUser Context: {_json_dumps(user_context)}"
         
         return f"""Analyze these symptoms: "{symptoms}"{context_info}
 
@@ -510,7 +908,7 @@ Respond with valid JSON only."""
             
             if start_idx != -1 and end_idx > start_idx:
                 json_str = response_text[start_idx:end_idx]
-                parsed_data = json.loads(json_str)
+                parsed_data = _json_loads(json_str)
                 
                 # Validate required fields
                 required_fields = ['conditions', 'general_recommendations', 'disclaimers']
@@ -526,9 +924,8 @@ Respond with valid JSON only."""
             self.logger.error(f"Failed to parse AI response: {str(e)}")
             return self._get_fallback_structured_response()
     
-    def _get_demo_response(self, symptoms: str, emergency_level: EmergencyLevel) -> Dict[str, Any]:
-        """Generate professional demo response."""
-        symptoms_lower = symptoms.lower()
+    def _get_demo_response(self, symptoms_norm: str, emergency_level: EmergencyLevel) -> Dict[str, Any]:
+        """Generate professional demo response from normalized symptom text."""
         conditions = []
         
         # Intelligent symptom matching
@@ -558,7 +955,7 @@ Respond with valid JSON only."""
         
         # Match symptoms to conditions
         for symptom, condition_data in symptom_mappings.items():
-            if symptom in symptoms_lower:
+            if symptom in symptoms_norm:
                 conditions.append({
                     **condition_data,
                     'recommendations': [
@@ -693,6 +1090,18 @@ Respond with valid JSON only."""
             'urgency_level': 'routine'
         }
     
+    @staticmethod
+    def _build_medical_condition(cond_data: Dict[str, Any]) -> MedicalCondition:
+        """Build a MedicalCondition from a parsed condition object."""
+        return MedicalCondition(
+            name=cond_data.get('name', 'Unknown Condition'),
+            description=cond_data.get('description', ''),
+            probability=cond_data.get('probability', 'Unknown'),
+            recommendations=cond_data.get('recommendations', []),
+            icd_code=cond_data.get('icd_code'),
+            severity=cond_data.get('severity', 'medium')
+        )
+    
     def _create_analysis_result(self, request_id: str, status: AnalysisStatus, 
                              analysis_data: Dict[str, Any], emergency_level: EmergencyLevel,
                              start_time: float) -> AnalysisResult:
@@ -700,16 +1109,10 @@ Respond with valid JSON only."""
         processing_time = int((time.time() - start_time) * 1000)
         
         # Convert conditions to MedicalCondition objects
-        conditions = []
-        for cond_data in analysis_data.get('conditions', []):
-            conditions.append(MedicalCondition(
-                name=cond_data.get('name', 'Unknown Condition'),
-                description=cond_data.get('description', ''),
-                probability=cond_data.get('probability', 'Unknown'),
-                recommendations=cond_data.get('recommendations', []),
-                icd_code=cond_data.get('icd_code'),
-                severity=cond_data.get('severity', 'medium')
-            ))
+        conditions = [
+            self._build_medical_condition(cond_data)
+            for cond_data in analysis_data.get('conditions', [])
+        ]
         
         return AnalysisResult(
             request_id=request_id,
@@ -721,7 +1124,7 @@ Respond with valid JSON only."""
             disclaimers=analysis_data.get('disclaimers', []),
             confidence_score=analysis_data.get('confidence_score', 0.0),
             processing_time_ms=processing_time,
-            timestamp=datetime.utcnow(),
+            timestamp=time.time_ns(),
             metadata={
                 'urgency_level': analysis_data.get('urgency_level', 'routine'),
                 'cache_hit': analysis_data.get('cache_hit', False)
@@ -733,74 +1136,104 @@ Respond with valid JSON only."""
         """Create error result."""
         processing_time = int((time.time() - start_time) * 1000)
         
-        return AnalysisResult(
+        return replace(
+            _ERROR_RESULT_TEMPLATE,
             request_id=request_id,
             status=status,
             conditions=[],
-            emergency_detected=False,
-            emergency_level=EmergencyLevel.NONE,
-            general_recommendations=['Professional medical consultation recommended'],
-            disclaimers=['Service temporarily unavailable'],
-            confidence_score=0.0,
+            general_recommendations=list(_ERROR_RESULT_TEMPLATE.general_recommendations),
+            disclaimers=list(_ERROR_RESULT_TEMPLATE.disclaimers),
             processing_time_ms=processing_time,
-            timestamp=datetime.utcnow(),
+            timestamp=time.time_ns(),
             metadata={'error_message': error_msg}
         )
     
     def _record_metrics(self, result: AnalysisResult) -> None:
-        """Record analysis metrics."""
-        metrics = AnalysisMetrics(
-            request_id=result.request_id,
-            timestamp=result.timestamp,
-            processing_time_ms=result.processing_time_ms,
-            status=result.status,
-            emergency_level=result.emergency_level,
-            cache_hit=result.metadata.get('cache_hit', False)
-        )
+        """Record analysis metrics.
+        
+        MetricsCollector copies the values out synchronously, so each thread
+        refills a single AnalysisMetrics instead of allocating one per request.
+        """
+        metrics = getattr(self._metrics_carrier, 'metrics', None)
+        if metrics is None:
+            metrics = self._metrics_carrier.metrics = AnalysisMetrics.__new__(AnalysisMetrics)
+        
+        metrics.request_id = result.request_id
+        metrics.timestamp = result.timestamp
+        metrics.processing_time_ms = result.processing_time_ms
+        metrics.status = result.status
+        metrics.emergency_level = result.emergency_level
+        metrics.token_usage = None
+        metrics.cache_hit = result.metadata.get('cache_hit', False)
+        metrics.error_type = None
         
         self.metrics.record_analysis(metrics)
     
-    def _log_emergency_case(self, symptoms: str, detected_keywords: List[str], 
+    def _log_emergency_case(self, symptoms: Union[str, bytes], detected_keywords: List[str], 
                           emergency_level: EmergencyLevel) -> None:
         """Log emergency cases with enhanced tracking."""
         try:
-            symptoms_hash = hashlib.sha256(symptoms.encode()).hexdigest()[:16]
+            if isinstance(symptoms, str):
+                symptoms = symptoms.encode()
+            # Anonymizing ID for log correlation; a 64-bit BLAKE2b digest is ample here
+            symptoms_hash = hashlib.blake2b(symptoms, digest_size=8).hexdigest()
             log_entry = {
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': _LazyIsoTimestamp(time.time_ns()),
                 'symptoms_hash': symptoms_hash,
                 'detected_keywords': detected_keywords,
                 'emergency_level': emergency_level.value,
                 'severity_score': emergency_level.value
             }
             
-            self.logger.critical(f"EMERGENCY CASE DETECTED: {log_entry}")
+            # Formatted only if a handler accepts the record; structured handlers can use `emergency`
+            self.logger.critical("EMERGENCY CASE DETECTED: %s", log_entry, extra={'emergency': log_entry})
             
         except Exception as e:
             self.logger.error(f"Failed to log emergency case: {str(e)}")
     
     def _generate_request_id(self) -> str:
         """Generate unique request ID."""
-        timestamp = str(int(time.time() * 1000))
-        random_part = hashlib.md5(f"{timestamp}{time.time()}".encode()).hexdigest()[:8]
-        return f"req_{timestamp}_{random_part}"
+        # Millisecond prefix keeps IDs roughly time-sortable; the suffix comes straight from the OS RNG
+        return f"req_{time.time_ns() // 1_000_000}_{secrets.token_hex(4)}"
     
     def get_system_metrics(self) -> Dict[str, Any]:
-        """Get comprehensive system metrics."""
-        return {
+        """Get comprehensive system metrics.
+        
+        Snapshots are reused for ``SYSTEM_METRICS_TTL_SECONDS`` so frequent
+        scrapes and health checks do not re-aggregate the metrics each time.
+        """
+        now = time.monotonic()
+        cached = self._system_metrics_cache
+        if cached is not None and now - cached[0] < self.SYSTEM_METRICS_TTL_SECONDS:
+            return cached[1]
+        
+        analysis_metrics = self.metrics.get_stats()
+        system_metrics = {
             'service_status': 'operational' if self.client else 'degraded',
             'cache_stats': {
-                'size': len(self.cache._cache),
+                'size': self.cache.size,
                 'max_size': self.cache.max_size,
-                'hit_rate': 'calculated_from_metrics'
+                'hit_rate': analysis_metrics.get('cache_hit_rate', 0)
             },
-            'analysis_metrics': self.metrics.get_stats(),
+            'analysis_metrics': analysis_metrics,
             'emergency_patterns_loaded': len(self.emergency_patterns),
             'uptime': 'calculated_from_startup'
         }
+        # Publishing is a single attribute assignment; a stale read is harmless
+        self._system_metrics_cache = (now, system_metrics)
+        return system_metrics
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ValidationResult:
     """Input validation result."""
     is_valid: bool
-    error_message: str
\ No newline at end of file
+    error_message: str
+
+
+# Validation outcomes are fixed, so frozen instances are shared across requests
+_VALID_INPUT = ValidationResult(True, "")
+_EMPTY_INPUT = ValidationResult(False, "Symptom description cannot be empty")
+_TOO_SHORT_INPUT = ValidationResult(False, "Please provide at least 10 characters describing your symptoms")
+_TOO_LONG_INPUT = ValidationResult(False, "Symptom description is too long (maximum 2000 characters)")
+_SUSPICIOUS_INPUT = ValidationResult(False, "Invalid characters detected in input")
\ No newline at end of file
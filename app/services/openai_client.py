@@ -0,0 +1,35 @@
+import os
+from functools import lru_cache
+from typing import Optional
+import httpx
+from openai import OpenAI
+
+# Connection pool shared by the sync client and the batch path's async client.
+# Every pooled connection stays alive, so after a burst of gevent requests the
+# extra HTTP/2 connections are reused instead of closed and handshaken again
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = HTTP_MAX_CONNECTIONS
+
+
+def http_limits() -> httpx.Limits:
+    """Connection pool limits for OpenAI HTTP clients."""
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+
+
+@lru_cache(maxsize=None)
+def get_client(api_key: Optional[str] = None, timeout: float = 30) -> OpenAI:
+    """Return the process-wide OpenAI client for this key and timeout.
+
+    The key defaults to OPENAI_API_KEY from the environment. Reusing one client
+    keeps its connections alive, so later requests skip the TCP and TLS handshake.
+    """
+    # HTTP/2 multiplexes concurrent requests over one kept-alive TLS connection
+    http_client = httpx.Client(
+        http2=True,
+        limits=http_limits(),
+        timeout=httpx.Timeout(timeout, connect=5.0)
+    )
+    return OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'), max_retries=2, http_client=http_client)
@@ -1,73 +1,23 @@
 import os
-from openai import OpenAI
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
 
-class SymptomAnalyzer:
-    """Simple symptom analyzer using OpenAI."""
-    
-    def __init__(self):
-        self.client = None
-        self._initialize_client()
-    
-    def _initialize_client(self):
-        """Initialize OpenAI client."""
-        try:
-            api_key = current_app.config.get('OPENAI_API_KEY')
-            if api_key:
-                self.client = OpenAI(api_key=api_key)
-        except Exception as e:
-            print(f"Failed to initialize OpenAI client: {str(e)}")
-    
-    def analyze_symptoms(self, symptoms: str, patient_data=None) -> dict:
-        """Analyze symptoms using OpenAI."""
-        if not self.client:
-            return self._get_demo_response(symptoms)
-        
-        try:
-            prompt = f"""
-            You are a medical information assistant. Analyze these symptoms and provide educational information only.
-            
-            IMPORTANT DISCLAIMERS:
-            - This is for educational purposes only
-            - Not a substitute for professional medical advice
-            - Always consult healthcare professionals for medical concerns
-            
-            Symptoms: {symptoms}
-            
-            Please provide:
-            1. Possible conditions (educational information only)
-            2. General recommendations
-            3. When to seek medical care
-            4. Emergency warning signs to watch for
-            
-            Format your response as a clear, helpful analysis while emphasizing the need for professional medical consultation.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful medical information assistant providing educational content only."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=800,
-                temperature=0.3
-            )
-            
-            analysis_text = response.choices[0].message.content
-            
-            return {
-                'analysis': analysis_text,
-                'disclaimer': 'This analysis is for educational purposes only. Always consult with healthcare professionals for medical advice.',
-                'emergency_note': 'If experiencing severe symptoms, seek immediate medical attention or call emergency services.'
-            }
-            
-        except Exception as e:
-            return self._get_demo_response(symptoms, str(e))
-    
-    def _get_demo_response(self, symptoms: str, error: str = None) -> dict:
-        """Provide a demo response when OpenAI is not available."""
-        return {
-            'analysis': f"""
+logger = logging.getLogger(__name__)
+
+# Disclaimer fields shared by every analysis response
+_RESPONSE_NOTES = {
+    'disclaimer': 'This analysis is for educational purposes only. Always consult with healthcare professionals for medical advice.',
+    'emergency_note': 'If experiencing severe symptoms, seek immediate medical attention or call emergency services.'
+}
+
+# Static demo analysis; only the symptoms and error note vary per call
+_DEMO_TEMPLATE = """
             **Educational Analysis for: "{symptoms}"**
             
             Based on the symptoms you've described, here are some general educational points:
@@ -93,8 +43,227 @@ class SymptomAnalyzer:
             - High fever
             - Any symptoms that concern you
             
-            {f"Note: OpenAI service unavailable ({error}). This is a demo response." if error else ""}
-            """,
-            'disclaimer': 'This analysis is for educational purposes only. Always consult with healthcare professionals for medical advice.',
-            'emergency_note': 'If experiencing severe symptoms, seek immediate medical attention or call emergency services.'
-        }
\ No newline at end of file
+            {error_note}
+            """
+_DEMO_ERROR_NOTE = "Note: OpenAI service unavailable ({}). This is a demo response."
+
+# Fixed parts of the analysis prompt; only the symptoms vary per request
+_PROMPT_PREFIX = """
+            You are a medical information assistant. Analyze these symptoms and provide educational information only.
+            
+            IMPORTANT DISCLAIMERS:
+            - This is for educational purposes only
+            - Not a substitute for professional medical advice
+            - Always consult healthcare professionals for medical concerns
+            
+            Symptoms: """
+_PROMPT_SUFFIX = """
+            
+            Please provide:
+            1. Possible conditions (educational information only)
+            2. General recommendations
+            3. When to seek medical care
+            4. Emergency warning signs to watch for
+            
+            Format your response as a clear, helpful analysis while emphasizing the need for professional medical consultation.
+            """
+_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful medical information assistant providing educational content only."}
+
+def get_analyzer() -> 'SymptomAnalyzer':
+    """Return the current app's shared SymptomAnalyzer, creating it on first use."""
+    analyzer = current_app.extensions.get('simple_analyzer')
+    if analyzer is None:
+        analyzer = current_app.extensions['simple_analyzer'] = SymptomAnalyzer()
+    return analyzer
+
+class SymptomAnalyzer:
+    """Simple symptom analyzer using OpenAI."""
+    
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    DEFAULT_MAX_TOKENS = 800
+    TEMPERATURE = 0.3
+    CACHE_SIZE = 1024
+    
+    def __init__(self):
+        self.client = None
+        self._api_key = None
+        self._model = self.DEFAULT_MODEL
+        self._max_tokens = self.DEFAULT_MAX_TOKENS
+        # Bounded LRU of analyses keyed by a digest of the normalized input and model settings
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._initialize_client()
+    
+    def _initialize_client(self):
+        """Initialize OpenAI client and read its settings from the app config once."""
+        try:
+            config = current_app.config
+            self._api_key = config.get('OPENAI_API_KEY')
+            self._model = config.get('OPENAI_MODEL', self.DEFAULT_MODEL)
+            self._max_tokens = config.get('OPENAI_MAX_TOKENS', self.DEFAULT_MAX_TOKENS)
+            
+            # Share the app-wide client created by init_openai
+            self.client = current_app.extensions.get('openai_client')
+            if self.client is None and self._api_key:
+                # init_openai skips keys that do not look like OpenAI keys; the
+                # cached get_client still gives such a key one shared pool
+                from app.services.openai_client import get_client
+                self.client = get_client(self._api_key, config.get('API_TIMEOUT', 30))
+        except Exception as e:
+            logger.warning("Failed to initialize OpenAI client: %s", e)
+    
+    def analyze_symptoms(self, symptoms: str, patient_data=None) -> dict:
+        """Analyze symptoms, reusing the result for previously seen input."""
+        # The demo response quotes the input and is cheap to rebuild, so it is never cached
+        if not self.client:
+            return self._get_demo_response(symptoms)
+        
+        key = self._cache_key(symptoms, patient_data)
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                return result
+        
+        result = self._analyze_uncached(symptoms, patient_data)
+        
+        # Fallback responses produced by an API failure are not cached
+        if 'error' not in result:
+            with self._cache_lock:
+                self._cache[key] = result
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return result
+    
+    def _cache_key(self, symptoms: str, patient_data=None) -> bytes:
+        """Digest of the whitespace-normalized symptoms, patient data and model settings.
+        
+        Case is kept so a cached analysis is only served for the exact text it
+        was produced from. Including the model settings means a configuration
+        change never serves analyses produced under the old settings.
+        """
+        parts = (
+            self._model,
+            str(self._max_tokens),
+            repr(self.TEMPERATURE),
+            ' '.join(symptoms.split()),
+            repr(sorted((patient_data or {}).items())),
+        )
+        return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=16).digest()
+    
+    def _analyze_uncached(self, symptoms: str, patient_data=None) -> dict:
+        """Analyze symptoms using OpenAI."""
+        try:
+            response = self.client.chat.completions.create(**self._build_request_body(symptoms))
+            
+            return self._build_analysis_response(response.choices[0].message.content)
+            
+        except Exception as e:
+            return self._get_demo_response(symptoms, str(e))
+    
+    def _build_request_body(self, symptoms: str) -> dict:
+        """Build the chat completion arguments for one symptom description."""
+        prompt = _PROMPT_PREFIX + symptoms + _PROMPT_SUFFIX
+        
+        return {
+            'model': self._model,
+            'messages': [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': self._max_tokens,
+            'temperature': self.TEMPERATURE
+        }
+    
+    def _build_analysis_response(self, analysis_text: str) -> dict:
+        """Wrap model output with the standard disclaimers."""
+        response = dict(_RESPONSE_NOTES)
+        response['analysis'] = analysis_text
+        return response
+    
+    def analyze_symptoms_batch(self, symptoms_list, patient_data=None, max_workers=16) -> list:
+        """Analyze several symptom descriptions concurrently.
+        
+        Each OpenAI call is network-bound, so the requests are issued in parallel
+        and the total wait is close to the slowest call rather than the sum.
+        Results are returned in the same order as ``symptoms_list``.
+        """
+        if not symptoms_list:
+            return []
+        
+        workers = min(max_workers, len(symptoms_list))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda symptoms: self.analyze_symptoms(symptoms, patient_data),
+                symptoms_list
+            ))
+    
+    def analyze_symptoms_bulk(self, symptoms_list, poll_interval=30, max_poll_interval=600) -> list:
+        """Analyze a large, non-interactive set of symptom descriptions via the Batch API.
+        
+        Requests are uploaded as one JSONL file and processed by OpenAI within a
+        24 hour window at reduced cost. This blocks while polling with backoff,
+        so it is meant for offline jobs rather than web requests. Results are
+        returned in the same order as ``symptoms_list``.
+        """
+        if not symptoms_list:
+            return []
+        if not self.client:
+            return [self._get_demo_response(symptoms) for symptoms in symptoms_list]
+        
+        lines = [
+            json.dumps({
+                'custom_id': f"job-{index}",
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self._build_request_body(symptoms)
+            })
+            for index, symptoms in enumerate(symptoms_list)
+        ]
+        
+        try:
+            input_file = self.client.files.create(
+                file=('symptom_batch.jsonl', '\n'.join(lines).encode('utf-8')),
+                purpose='batch'
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
+            )
+            
+            interval = poll_interval
+            while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+                time.sleep(interval)
+                interval = min(interval * 2, max_poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            
+            outputs = {}
+            if batch.output_file_id:
+                for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    response = record.get('response') or {}
+                    if response.get('status_code') == 200:
+                        outputs[record['custom_id']] = response['body']['choices'][0]['message']['content']
+        except Exception as e:
+            return [self._get_demo_response(symptoms, str(e)) for symptoms in symptoms_list]
+        
+        return [
+            self._build_analysis_response(outputs[f"job-{index}"])
+            if f"job-{index}" in outputs
+            else self._get_demo_response(symptoms, f"No batch result returned (batch status: {batch.status})")
+            for index, symptoms in enumerate(symptoms_list)
+        ]
+    
+    def _get_demo_response(self, symptoms: str, error: str = None) -> dict:
+        """Provide a demo response when OpenAI is not available."""
+        response = dict(_RESPONSE_NOTES)
+        response['analysis'] = _DEMO_TEMPLATE.format(
+            symptoms=symptoms,
+            error_note=_DEMO_ERROR_NOTE.format(error) if error else ""
+        )
+        if error:
+            response['error'] = error
+        return response
\ No newline at end of file
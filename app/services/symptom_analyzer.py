@@ -1,101 +1,423 @@
+import asyncio
 import json
 import logging
 import hashlib
 import re
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, FrozenSet, List, Optional, Tuple
 from flask import current_app
 
+# httpx and the OpenAI SDK are slow to import, so they are loaded only where
+# a client is actually built
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Each branch is a named group so a single scan can tell which of the
+# emergency patterns fired; every distinct pattern adds to the score once.
+_EMERGENCY_PATTERN_RE = re.compile(
+    r"\b(?:"
+    r"(?P<sudden_onset>(?:sudden|severe|intense|excruciating)\s+(?:chest|heart|breathing))"
+    r"|(?P<cannot_function>(?:can't|cannot)\s+(?:breathe|breath|move|speak))"
+    r"|(?P<lost_function>(?:losing|lost)\s+(?:consciousness|vision|feeling))"
+    r"|(?P<bleeding>(?:severe|heavy|profuse)\s+bleeding)"
+    r")"
+)
+_EMERGENCY_PATTERN_SCORE = 6
+
+# Demo-mode symptom groups, matched as plain substrings like the original
+# keyword checks. The lookahead makes each match zero-width so overlapping
+# keywords from different groups are all seen in one scan.
+_DEMO_GROUPS_RE = re.compile(
+    r"(?=(?P<head>head)|(?P<respiratory>cough|cold|congestion)|(?P<fatigue>tired|fatigue|exhausted))"
+)
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _has_complete_json_object(text: str) -> bool:
+    """Whether text already holds a decodable JSON object starting at its first brace."""
+    start = text.find('{')
+    if start == -1:
+        return False
+    try:
+        _JSON_DECODER.raw_decode(text, start)
+    except ValueError:
+        return False
+    return True
+
+# Slotted dataclasses drop the per-instance __dict__; slots=True needs Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class Condition:
+    """Demo-mode condition, converted to a dict only when the response is built."""
+    name: str
+    description: str
+    probability: str
+    recommendations: List[str]
+    urgency: str = "Routine"
+    specialty: Optional[str] = None
+
+# Reference tables are built once at import and shared read-only by every analyzer
+_MEDICAL_SPECIALTIES = MappingProxyType({
+    'cardiology': ('chest pain', 'heart palpitations', 'shortness of breath', 'irregular heartbeat'),
+    'neurology': ('headache', 'dizziness', 'seizure', 'memory loss', 'numbness', 'tingling'),
+    'gastroenterology': ('abdominal pain', 'nausea', 'vomiting', 'diarrhea', 'constipation'),
+    'dermatology': ('rash', 'skin lesion', 'itching', 'skin discoloration'),
+    'orthopedics': ('joint pain', 'back pain', 'muscle pain', 'fracture', 'sprain'),
+    'psychiatry': ('depression', 'anxiety', 'mood changes', 'sleep problems'),
+    'endocrinology': ('diabetes', 'thyroid', 'hormone', 'weight changes'),
+    'pulmonology': ('cough', 'breathing problems', 'chest tightness', 'wheezing')
+})
+
+_EMERGENCY_KEYWORDS = MappingProxyType({
+    'chest pain': 10,
+    'difficulty breathing': 10,
+    'unconscious': 10,
+    'severe bleeding': 10,
+    'heart attack': 10,
+    'stroke': 10,
+    'anaphylaxis': 10,
+    'seizure': 9,
+    'severe headache': 8,
+    'high fever': 7,
+    'severe pain': 7,
+    'vomiting blood': 9,
+    'confusion': 6,
+    'severe dizziness': 6
+})
+
+_DRUG_INTERACTIONS = MappingProxyType({
+    'blood_thinners': ('aspirin', 'warfarin', 'bleeding risk'),
+    'diabetes_meds': ('insulin', 'metformin', 'blood sugar monitoring'),
+    'heart_meds': ('beta blockers', 'ACE inhibitors', 'blood pressure'),
+    'pain_meds': ('NSAIDs', 'opioids', 'liver function')
+})
+
+_RED_FLAG_INDICATORS = MappingProxyType({
+    'chest pain': 'Chest pain may indicate heart attack or other cardiac emergency',
+    'difficulty breathing': 'Breathing difficulties require immediate medical evaluation',
+    'severe headache': 'Sudden severe headache may indicate stroke or other emergency',
+    'high fever': 'High fever, especially with other symptoms, needs prompt evaluation',
+    'confusion': 'Confusion or altered mental state requires immediate assessment',
+    'severe bleeding': 'Severe bleeding requires emergency medical care'
+})
+
+_RISK_KEYWORDS = MappingProxyType({
+    'chest pain': 'Chest pain requires cardiac evaluation',
+    'shortness of breath': 'Breathing difficulties need immediate assessment'
+})
+
+
+def _build_specialty_index() -> Dict[str, Tuple[int, str]]:
+    """Invert the specialty table to keyword -> (table position, specialty).
+    
+    The position keeps the table order as the tie-breaker when keywords
+    from several specialties appear in the same description.
+    """
+    return {
+        keyword: (rank, specialty.title())
+        for rank, (specialty, keywords) in enumerate(_MEDICAL_SPECIALTIES.items())
+        for keyword in keywords
+    }
+
+
+def _build_keyword_scanner() -> Tuple['re.Pattern', Dict[str, List[str]]]:
+    """Compile every keyword table into one pattern for a single-pass scan.
+    
+    The alternation is longest first inside a lookahead, so every start
+    position reports its longest keyword; shorter keywords that are a
+    prefix of it are recovered from the returned prefix map.
+    """
+    keywords = set(_EMERGENCY_KEYWORDS) | set(_RED_FLAG_INDICATORS) | set(_RISK_KEYWORDS)
+    for specialty_keywords in _MEDICAL_SPECIALTIES.values():
+        keywords.update(specialty_keywords)
+    
+    ordered = sorted(keywords, key=lambda kw: (-len(kw), kw))
+    pattern = re.compile('(?=(' + '|'.join(re.escape(kw) for kw in ordered) + '))')
+    prefixes = {
+        kw: [other for other in keywords if other != kw and kw.startswith(other)]
+        for kw in keywords
+    }
+    return pattern, prefixes
+
+
+_KEYWORD_TO_SPECIALTY = _build_specialty_index()
+_KEYWORD_RE, _KEYWORD_PREFIXES = _build_keyword_scanner()
+
+# The scans below depend only on the lowercased symptoms, so repeated
+# descriptions are answered from the caches; patient data is layered on
+# by the SymptomAnalyzer methods.
+
+@lru_cache(maxsize=8192)
+def _scan_keywords(symptoms_lower: str) -> FrozenSet[str]:
+    """Return every known keyword that occurs in the lowercased symptoms."""
+    hits = set()
+    for match in _KEYWORD_RE.finditer(symptoms_lower):
+        keyword = match.group(1)
+        hits.add(keyword)
+        hits.update(_KEYWORD_PREFIXES[keyword])
+    return frozenset(hits)
+
+
+@lru_cache(maxsize=8192)
+def _scan_emergency_keywords(symptoms_lower: str) -> Tuple[Tuple[Tuple[str, int], ...], int]:
+    """Return the matched (keyword, score) pairs and the emergency pattern score."""
+    hits = _scan_keywords(symptoms_lower)
+    matched = tuple((keyword, score) for keyword, score in _EMERGENCY_KEYWORDS.items() if keyword in hits)
+    matched_patterns = {match.lastgroup for match in _EMERGENCY_PATTERN_RE.finditer(symptoms_lower)}
+    return matched, _EMERGENCY_PATTERN_SCORE * len(matched_patterns)
+
+
+@lru_cache(maxsize=8192)
+def _scan_red_flags(symptoms_lower: str) -> Tuple[str, ...]:
+    """Return the red flag warnings for the lowercased symptoms in table order."""
+    hits = _scan_keywords(symptoms_lower)
+    return tuple(warning for indicator, warning in _RED_FLAG_INDICATORS.items() if indicator in hits)
+
+
+def init_openai(app):
+    """Create the app-wide OpenAI client so analyzers share one connection pool."""
+    api_key = app.config.get('OPENAI_API_KEY')
+    if api_key and len(api_key) > 40:
+        # Deferred so importing the app does not pay for the SDK import
+        from app.services.openai_client import get_client
+        
+        app.extensions['openai_client'] = get_client(api_key, app.config.get('API_TIMEOUT', 30))
+        logger.info("OpenAI client initialized successfully")
+
+
+def get_analyzer() -> 'SymptomAnalyzer':
+    """Return the current app's shared SymptomAnalyzer, creating it on first use."""
+    analyzer = current_app.extensions.get('analyzer')
+    if analyzer is None:
+        analyzer = current_app.extensions['analyzer'] = SymptomAnalyzer()
+    return analyzer
+
 class SymptomAnalyzer:
     """Advanced symptom analyzer service with enhanced medical analysis."""
     
+    MODEL = "gpt-3.5-turbo"
+    TEMPERATURE = 0.2
+    RESPONSE_CACHE_SIZE = 4096
+    RESPONSE_CACHE_TTL = 3600
+    
+    # Shared across instances so every request handler reuses earlier analyses;
+    # maps key -> (expires_at, result) in least recently used order
+    _response_cache = OrderedDict()
+    _response_cache_lock = threading.Lock()
+    
     def __init__(self):
         self.client = None
+        self._api_key = None
         self._initialize_client()
-        self.medical_specialties = self._load_medical_specialties()
-        self.emergency_keywords = self._load_emergency_keywords()
-        self.drug_interactions = self._load_common_drug_interactions()
+        self.medical_specialties = _MEDICAL_SPECIALTIES
+        self.emergency_keywords = _EMERGENCY_KEYWORDS
+        self.drug_interactions = _DRUG_INTERACTIONS
+        self.red_flag_indicators = _RED_FLAG_INDICATORS
+        self.risk_keywords = _RISK_KEYWORDS
+        self._keyword_to_specialty = _KEYWORD_TO_SPECIALTY
     
     def _initialize_client(self):
-        """Initialize OpenAI client."""
+        """Use the app-wide OpenAI client created by init_openai."""
         try:
-            api_key = current_app.config.get('OPENAI_API_KEY')
-            if api_key and len(api_key) > 40:
-                self.client = OpenAI(api_key=api_key)
-                logging.info("OpenAI client initialized successfully")
+            self.client = current_app.extensions.get('openai_client')
+            if self.client:
+                self._api_key = self.client.api_key
         except Exception as e:
-            logging.error(f"Failed to initialize OpenAI client: {str(e)}")
+            logger.error("Failed to initialize OpenAI client: %s", e)
     
     def analyze_symptoms(self, symptoms: str, patient_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Enhanced symptom analysis with patient context."""
+        # Lowercased once and shared by the cache key and every keyword check
+        symptoms_lower = symptoms.lower()
+        
+        # Emergencies are answered locally; the advice does not depend on the model
+        if self._detect_emergency_advanced(symptoms, patient_data, symptoms_lower):
+            return self._get_emergency_response(symptoms, patient_data, symptoms_lower)
+        
         if not self.client:
-            return self._get_demo_response(symptoms, patient_data)
+            return self._get_demo_response(symptoms, patient_data, symptoms_lower)
+        
+        cache_key = self._response_cache_key(symptoms_lower, patient_data)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            # Build enhanced prompt with patient context
-            system_prompt = self._get_enhanced_system_prompt()
-            user_prompt = self._build_contextual_prompt(symptoms, patient_data)
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.2
+            stream = self.client.chat.completions.create(
+                stream=True, **self._build_completion_request(symptoms, patient_data)
             )
+            return self._complete_analysis(symptoms, patient_data, self._read_stream(stream),
+                                           cache_key, symptoms_lower)
             
-            result = self._parse_response(response.choices[0].message.content)
-            
-            # Enhanced analysis features
-            result['emergency_detected'] = self._detect_emergency_advanced(symptoms, patient_data)
-            result['specialist_referral'] = self._suggest_specialist(symptoms, result.get('conditions', []))
-            result['risk_factors'] = self._assess_risk_factors(symptoms, patient_data)
-            result['follow_up_timeline'] = self._suggest_follow_up_timeline(result.get('conditions', []))
-            result['red_flags'] = self._identify_red_flags(symptoms, patient_data)
-            
-            # Log analysis for quality improvement
-            self._log_analysis(symptoms, result, patient_data)
-            
-            return result
+        except Exception as e:
+            logger.error("API error: %s", e)
+            return self._get_demo_response(symptoms, patient_data, symptoms_lower)
+    
+    def analyze_symptoms_batch(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze several cases concurrently.
+        
+        Each case is a dict with ``symptoms`` and an optional ``patient_data``.
+        The OpenAI calls overlap, so the batch takes about as long as its
+        slowest case. Results are returned in the same order as ``cases``.
+        """
+        if not self.client:
+            return [self.analyze_symptoms(case['symptoms'], case.get('patient_data')) for case in cases]
+        return asyncio.run(self._analyze_batch_async(cases))
+    
+    async def _analyze_batch_async(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run every case of a batch on one async client bound to the current event loop."""
+        import httpx
+        from openai import AsyncOpenAI
+        from app.services.openai_client import http_limits
+        
+        http_client = httpx.AsyncClient(http2=True, limits=http_limits(), timeout=self.client.timeout)
+        async with AsyncOpenAI(api_key=self._api_key, http_client=http_client) as async_client:
+            return await asyncio.gather(*[
+                self._analyze_one(async_client, case['symptoms'], case.get('patient_data'))
+                for case in cases
+            ])
+    
+    async def _analyze_one(self, async_client: 'AsyncOpenAI', symptoms: str,
+                           patient_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async counterpart of analyze_symptoms for a single case of a batch."""
+        symptoms_lower = symptoms.lower()
+        if self._detect_emergency_advanced(symptoms, patient_data, symptoms_lower):
+            return self._get_emergency_response(symptoms, patient_data, symptoms_lower)
+        
+        cache_key = self._response_cache_key(symptoms_lower, patient_data)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            stream = await async_client.chat.completions.create(
+                stream=True, **self._build_completion_request(symptoms, patient_data)
+            )
+            return self._complete_analysis(symptoms, patient_data, await self._read_stream_async(stream),
+                                           cache_key, symptoms_lower)
             
         except Exception as e:
-            logging.error(f"API error: {str(e)}")
-            return self._get_demo_response(symptoms, patient_data)
+            logger.error("API error: %s", e)
+            return self._get_demo_response(symptoms, patient_data, symptoms_lower)
     
-    def _get_system_prompt(self) -> str:
-        """Get system prompt for analysis."""
-        return """You are a medical information assistant. Analyze symptoms and provide educational information only.
-
-Respond with JSON in this format:
-{
-    "conditions": [
-        {
-            "name": "Condition Name",
-            "description": "Brief description",
-            "probability": "High|Medium|Low",
-            "recommendations": ["Action 1", "Action 2"]
+    def _read_stream(self, stream) -> str:
+        """Collect streamed response text, stopping once the first JSON object is complete.
+        
+        Anything the model writes after the object is ignored by _parse_response,
+        so the stream is closed early and its connection goes back to the pool.
+        """
+        buffer = ''
+        try:
+            for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content = chunk.choices[0].delta.content
+                buffer += content
+                if '}' in content and _has_complete_json_object(buffer):
+                    break
+        finally:
+            stream.close()
+        return buffer
+    
+    async def _read_stream_async(self, stream) -> str:
+        """Async counterpart of _read_stream."""
+        buffer = ''
+        try:
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                content = chunk.choices[0].delta.content
+                buffer += content
+                if '}' in content and _has_complete_json_object(buffer):
+                    break
+        finally:
+            await stream.close()
+        return buffer
+    
+    def _build_completion_request(self, symptoms: str, patient_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the chat completion arguments with the patient context prompt."""
+        return {
+            'model': self.MODEL,
+            'messages': [
+                {"role": "system", "content": self._get_enhanced_system_prompt()},
+                {"role": "user", "content": self._build_contextual_prompt(symptoms, patient_data)}
+            ],
+            'max_tokens': 1500,
+            'temperature': self.TEMPERATURE
         }
-    ],
-    "general_recommendations": ["General advice"],
-    "disclaimers": ["Educational disclaimer"]
-}
-
-Always include disclaimers about consulting healthcare professionals."""
+    
+    def _complete_analysis(self, symptoms: str, patient_data: Optional[Dict[str, Any]],
+                           response_text: str, cache_key: str, symptoms_lower: str) -> Dict[str, Any]:
+        """Parse a model response, add the local analysis features and cache it."""
+        result = self._parse_response(response_text)
+        
+        # Enhanced analysis features
+        result['emergency_detected'] = self._detect_emergency_advanced(symptoms, patient_data, symptoms_lower)
+        result['specialist_referral'] = self._suggest_specialist(symptoms, result.get('conditions', []), symptoms_lower)
+        result['risk_factors'] = self._assess_risk_factors(symptoms, patient_data, symptoms_lower)
+        result['follow_up_timeline'] = self._suggest_follow_up_timeline(result.get('conditions', []))
+        result['red_flags'] = self._identify_red_flags(symptoms, patient_data, symptoms_lower)
+        
+        # Log analysis for quality improvement
+        self._log_analysis(symptoms, result, patient_data)
+        
+        self._store_cached_response(cache_key, result)
+        return result
+    
+    @classmethod
+    def _response_cache_key(cls, symptoms_lower: str, patient_data: Optional[Dict[str, Any]]) -> str:
+        """Digest of the normalized symptoms, canonical patient data and model settings."""
+        # Inputs differing only in spacing share one entry
+        payload = json.dumps(
+            {"s": ' '.join(symptoms_lower.split()), "p": patient_data or {},
+             "m": cls.MODEL, "t": cls.TEMPERATURE},
+            sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return an unexpired cached analysis, dropping it if it has expired."""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return result
+    
+    def _store_cached_response(self, key: str, result: Dict[str, Any]) -> None:
+        """Cache an analysis, evicting the least recently used entry when full."""
+        with self._response_cache_lock:
+            self._response_cache[key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, result)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
     
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse API response."""
-        try:
-            # Try to extract JSON from response
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = response_text[start:end]
-                return json.loads(json_str)
-        except:
-            pass
+        # Decode the JSON object starting at the first brace; any prose after
+        # it is ignored instead of being sliced in by the last brace
+        start = response_text.find('{')
+        if start != -1:
+            try:
+                result, _ = _JSON_DECODER.raw_decode(response_text, start)
+                return result
+            except ValueError:
+                pass
         
         # Fallback if parsing fails
         return {
@@ -109,119 +431,27 @@ Always include disclaimers about consulting healthcare professionals."""
             "disclaimers": ["This is for educational purposes only"]
         }
     
-    def _detect_emergency(self, symptoms: str) -> bool:
-        """Simple emergency symptom detection."""
-        emergency_keywords = [
-            'chest pain', 'difficulty breathing', 'shortness of breath',
-            'severe bleeding', 'unconscious', 'heart attack', 'stroke',
-            'severe allergic reaction', 'anaphylaxis', 'seizure'
-        ]
-        
-        symptoms_lower = symptoms.lower()
-        return any(keyword in symptoms_lower for keyword in emergency_keywords)
-    
-    def _get_demo_response(self, symptoms: str) -> Dict[str, Any]:
-        """Demo response when API is unavailable."""
-        symptoms_lower = symptoms.lower()
-        
-        # Simple symptom matching
-        if any(word in symptoms_lower for word in ['headache', 'head']):
-            condition_name = "Tension Headache"
-            description = "A common type of headache often caused by stress or muscle tension."
-        elif any(word in symptoms_lower for word in ['cough', 'cold']):
-            condition_name = "Common Cold"
-            description = "A viral infection of the upper respiratory tract."
-        elif any(word in symptoms_lower for word in ['tired', 'fatigue']):
-            condition_name = "General Fatigue"
-            description = "Feeling of tiredness that can have various causes."
-        else:
-            condition_name = "General Health Concern"
-            description = "Your symptoms require professional medical evaluation."
-        
-        return {
-            "conditions": [{
-                "name": condition_name,
-                "description": description,
-                "probability": "Medium",
-                "recommendations": [
-                    "Monitor your symptoms",
-                    "Get adequate rest and hydration",
-                    "Consult a healthcare professional if symptoms persist"
-                ]
-            }],
-            "emergency_detected": self._detect_emergency(symptoms),
-            "general_recommendations": [
-                "Always consult healthcare professionals for medical concerns",
-                "Seek immediate care if symptoms worsen"
-            ],
-            "disclaimers": [
-                "This tool is for educational purposes only",
-                "Not a substitute for professional medical diagnosis",
-                "Always consult healthcare professionals for medical advice"
-            ]
-        }
-
-    def _load_medical_specialties(self) -> Dict[str, List[str]]:
-        """Load medical specialties and their associated conditions."""
-        return {
-            'cardiology': ['chest pain', 'heart palpitations', 'shortness of breath', 'irregular heartbeat'],
-            'neurology': ['headache', 'dizziness', 'seizure', 'memory loss', 'numbness', 'tingling'],
-            'gastroenterology': ['abdominal pain', 'nausea', 'vomiting', 'diarrhea', 'constipation'],
-            'dermatology': ['rash', 'skin lesion', 'itching', 'skin discoloration'],
-            'orthopedics': ['joint pain', 'back pain', 'muscle pain', 'fracture', 'sprain'],
-            'psychiatry': ['depression', 'anxiety', 'mood changes', 'sleep problems'],
-            'endocrinology': ['diabetes', 'thyroid', 'hormone', 'weight changes'],
-            'pulmonology': ['cough', 'breathing problems', 'chest tightness', 'wheezing']
-        }
-    
-    def _load_emergency_keywords(self) -> Dict[str, int]:
-        """Load emergency keywords with severity scores."""
-        return {
-            'chest pain': 10,
-            'difficulty breathing': 10,
-            'unconscious': 10,
-            'severe bleeding': 10,
-            'heart attack': 10,
-            'stroke': 10,
-            'anaphylaxis': 10,
-            'seizure': 9,
-            'severe headache': 8,
-            'high fever': 7,
-            'severe pain': 7,
-            'vomiting blood': 9,
-            'confusion': 6,
-            'severe dizziness': 6
-        }
-    
-    def _load_common_drug_interactions(self) -> Dict[str, List[str]]:
-        """Load common drug interactions and warnings."""
-        return {
-            'blood_thinners': ['aspirin', 'warfarin', 'bleeding risk'],
-            'diabetes_meds': ['insulin', 'metformin', 'blood sugar monitoring'],
-            'heart_meds': ['beta blockers', 'ACE inhibitors', 'blood pressure'],
-            'pain_meds': ['NSAIDs', 'opioids', 'liver function']
-        }
-    
     def _build_contextual_prompt(self, symptoms: str, patient_data: Optional[Dict[str, Any]]) -> str:
         """Build enhanced prompt with patient context."""
-        prompt = f"Analyze these symptoms: {symptoms}\n\n"
+        parts = [f"Analyze these symptoms: {symptoms}", ""]
         
         if patient_data:
             if patient_data.get('age_range'):
-                prompt += f"Patient age range: {patient_data['age_range']}\n"
+                parts.append(f"Patient age range: {patient_data['age_range']}")
             if patient_data.get('gender'):
-                prompt += f"Gender: {patient_data['gender']}\n"
+                parts.append(f"Gender: {patient_data['gender']}")
             if patient_data.get('pain_level'):
-                prompt += f"Pain level: {patient_data['pain_level']}\n"
+                parts.append(f"Pain level: {patient_data['pain_level']}")
             if patient_data.get('duration'):
-                prompt += f"Symptom duration: {patient_data['duration']}\n"
+                parts.append(f"Symptom duration: {patient_data['duration']}")
             if patient_data.get('has_fever'):
-                prompt += "Patient reports fever\n"
+                parts.append("Patient reports fever")
             if patient_data.get('taking_medications'):
-                prompt += "Patient is taking medications\n"
+                parts.append("Patient is taking medications")
         
-        prompt += "\nProvide comprehensive analysis including differential diagnosis, urgency assessment, and specialist referral recommendations."
-        return prompt
+        parts.append("")
+        parts.append("Provide comprehensive analysis including differential diagnosis, urgency assessment, and specialist referral recommendations.")
+        return "\n".join(parts)
     
     def _get_enhanced_system_prompt(self) -> str:
         """Enhanced system prompt for comprehensive analysis."""
@@ -255,16 +485,18 @@ Respond with detailed JSON in this format:
 
 Always emphasize this is educational information only and professional medical consultation is required."""
     
-    def _detect_emergency_advanced(self, symptoms: str, patient_data: Optional[Dict[str, Any]]) -> bool:
+    def _detect_emergency_advanced(self, symptoms: str, patient_data: Optional[Dict[str, Any]],
+                                   symptoms_lower: Optional[str] = None) -> bool:
         """Advanced emergency detection with scoring."""
-        symptoms_lower = symptoms.lower()
+        if symptoms_lower is None:
+            symptoms_lower = symptoms.lower()
+        matched_keywords, pattern_score = _scan_emergency_keywords(symptoms_lower)
         emergency_score = 0
         
         # Check emergency keywords with weighted scoring
-        for keyword, score in self.emergency_keywords.items():
-            if keyword in symptoms_lower:
-                emergency_score += score
-                logging.warning(f"Emergency keyword detected: {keyword} (score: {score})")
+        for keyword, score in matched_keywords:
+            emergency_score += score
+            logger.warning("Emergency keyword detected: %s (score: %s)", keyword, score)
         
         # Additional context-based scoring
         if patient_data:
@@ -276,27 +508,20 @@ Always emphasize this is educational information only and professional medical c
                 emergency_score += 2  # Higher risk for very young or elderly
         
         # Pattern-based detection
-        emergency_patterns = [
-            r'\b(sudden|severe|intense|excruciating)\s+(chest|heart|breathing)',
-            r'\b(can\'t|cannot)\s+(breathe|breath|move|speak)',
-            r'\b(losing|lost)\s+(consciousness|vision|feeling)',
-            r'\b(severe|heavy|profuse)\s+bleeding'
-        ]
-        
-        for pattern in emergency_patterns:
-            if re.search(pattern, symptoms_lower):
-                emergency_score += 6
+        emergency_score += pattern_score
         
         return emergency_score >= 8
     
-    def _suggest_specialist(self, symptoms: str, conditions: List[Dict[str, Any]]) -> Optional[str]:
+    def _suggest_specialist(self, symptoms: str, conditions: List[Dict[str, Any]],
+                            symptoms_lower: Optional[str] = None) -> Optional[str]:
         """Suggest appropriate medical specialist based on symptoms."""
-        symptoms_lower = symptoms.lower()
+        if symptoms_lower is None:
+            symptoms_lower = symptoms.lower()
+        keyword_hits = _scan_keywords(symptoms_lower)
         
-        for specialty, keywords in self.medical_specialties.items():
-            for keyword in keywords:
-                if keyword in symptoms_lower:
-                    return specialty.title()
+        matches = [self._keyword_to_specialty[kw] for kw in keyword_hits if kw in self._keyword_to_specialty]
+        if matches:
+            return min(matches)[1]
         
         # Check conditions for specialty recommendations
         for condition in conditions:
@@ -310,7 +535,8 @@ Always emphasize this is educational information only and professional medical c
         
         return None
     
-    def _assess_risk_factors(self, symptoms: str, patient_data: Optional[Dict[str, Any]]) -> List[str]:
+    def _assess_risk_factors(self, symptoms: str, patient_data: Optional[Dict[str, Any]],
+                             symptoms_lower: Optional[str] = None) -> List[str]:
         """Assess risk factors based on symptoms and patient data."""
         risk_factors = []
         
@@ -328,11 +554,12 @@ Always emphasize this is educational information only and professional medical c
                 risk_factors.append('Known allergies may complicate treatment options')
         
         # Symptom-based risk factors
-        symptoms_lower = symptoms.lower()
-        if 'chest pain' in symptoms_lower:
-            risk_factors.append('Chest pain requires cardiac evaluation')
-        if 'shortness of breath' in symptoms_lower:
-            risk_factors.append('Breathing difficulties need immediate assessment')
+        if symptoms_lower is None:
+            symptoms_lower = symptoms.lower()
+        keyword_hits = _scan_keywords(symptoms_lower)
+        for keyword, risk in self.risk_keywords.items():
+            if keyword in keyword_hits:
+                risk_factors.append(risk)
         
         return risk_factors
     
@@ -352,33 +579,24 @@ Always emphasize this is educational information only and professional medical c
         else:
             return "Schedule routine appointment within 2-4 weeks"
     
-    def _identify_red_flags(self, symptoms: str, patient_data: Optional[Dict[str, Any]]) -> List[str]:
+    def _identify_red_flags(self, symptoms: str, patient_data: Optional[Dict[str, Any]],
+                            symptoms_lower: Optional[str] = None) -> List[str]:
         """Identify red flag symptoms requiring immediate attention."""
-        red_flags = []
-        symptoms_lower = symptoms.lower()
-        
-        red_flag_indicators = {
-            'chest pain': 'Chest pain may indicate heart attack or other cardiac emergency',
-            'difficulty breathing': 'Breathing difficulties require immediate medical evaluation',
-            'severe headache': 'Sudden severe headache may indicate stroke or other emergency',
-            'high fever': 'High fever, especially with other symptoms, needs prompt evaluation',
-            'confusion': 'Confusion or altered mental state requires immediate assessment',
-            'severe bleeding': 'Severe bleeding requires emergency medical care'
-        }
-        
-        for indicator, warning in red_flag_indicators.items():
-            if indicator in symptoms_lower:
-                red_flags.append(warning)
-        
-        return red_flags
+        if symptoms_lower is None:
+            symptoms_lower = symptoms.lower()
+        return list(_scan_red_flags(symptoms_lower))
     
     def _log_analysis(self, symptoms: str, result: Dict[str, Any], patient_data: Optional[Dict[str, Any]]):
         """Log analysis for quality improvement and monitoring."""
+        # Skip hashing and building the entry when INFO records would be dropped
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         try:
             # Create anonymized log entry
-            symptoms_hash = hashlib.sha256(symptoms.encode()).hexdigest()[:16]
+            symptoms_hash = hashlib.blake2b(symptoms.encode('utf-8'), digest_size=8).hexdigest()
             log_entry = {
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': time.time_ns(),
                 'symptoms_hash': symptoms_hash,
                 'emergency_detected': result.get('emergency_detected', False),
                 'conditions_count': len(result.get('conditions', [])),
@@ -387,10 +605,10 @@ Always emphasize this is educational information only and professional medical c
                 'has_patient_data': patient_data is not None
             }
             
-            logging.info(f"SYMPTOM_ANALYSIS: {log_entry}")
+            logger.info("SYMPTOM_ANALYSIS: %s", json.dumps(log_entry, separators=(',', ':')))
             
         except Exception as e:
-            logging.error(f"Failed to log analysis: {str(e)}")
+            logger.error("Failed to log analysis: %s", e)
     
     def get_analysis_statistics(self) -> Dict[str, Any]:
         """Get analysis statistics for monitoring."""
@@ -402,80 +620,117 @@ Always emphasize this is educational information only and professional medical c
             'specialist_referrals': 'N/A - Demo Mode'
         }
     
-    def _get_demo_response(self, symptoms: str, patient_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _get_emergency_response(self, symptoms: str, patient_data: Optional[Dict[str, Any]],
+                                symptoms_lower: str) -> Dict[str, Any]:
+        """Response for symptoms the keyword and pattern screen flags as an emergency."""
+        conditions = [asdict(Condition(
+            name="Possible Medical Emergency",
+            description="Your symptoms include warning signs that need immediate medical attention.",
+            probability="High",
+            recommendations=[
+                "Call emergency services (911) or go to the nearest emergency room now",
+                "Do not drive yourself if you feel faint, confused or short of breath",
+                "Do not wait to see if symptoms improve on their own"
+            ],
+            urgency="Emergency",
+            specialty="Emergency Medicine"
+        ))]
+        
+        return {
+            "conditions": conditions,
+            "emergency_detected": True,
+            "specialist_referral": self._suggest_specialist(symptoms, conditions, symptoms_lower),
+            "risk_factors": self._assess_risk_factors(symptoms, patient_data, symptoms_lower),
+            "follow_up_timeline": self._suggest_follow_up_timeline(conditions),
+            "red_flags": self._identify_red_flags(symptoms, patient_data, symptoms_lower),
+            "general_recommendations": [
+                "Get emergency medical care now",
+                "Tell responders about all symptoms, medications and allergies"
+            ],
+            "disclaimers": [
+                "This analysis is for educational purposes only",
+                "Not a substitute for professional medical diagnosis",
+                "Seek immediate care for emergency symptoms"
+            ],
+            "triage_level": "Emergency",
+            "confidence_score": 0.9
+        }
+    
+    def _get_demo_response(self, symptoms: str, patient_data: Optional[Dict[str, Any]] = None,
+                           symptoms_lower: Optional[str] = None) -> Dict[str, Any]:
         """Enhanced demo response with patient context."""
-        symptoms_lower = symptoms.lower()
+        if symptoms_lower is None:
+            symptoms_lower = symptoms.lower()
         
         # Enhanced symptom matching with patient context
         conditions = []
         
-        if any(word in symptoms_lower for word in ['headache', 'head']):
+        demo_groups = {match.lastgroup for match in _DEMO_GROUPS_RE.finditer(symptoms_lower)}
+        
+        if 'head' in demo_groups:
             urgency = 'Urgent' if patient_data and patient_data.get('pain_level') == '9-10' else 'Routine'
-            conditions.append({
-                "name": "Tension Headache",
-                "description": "A common type of headache often caused by stress, muscle tension, or dehydration.",
-                "probability": "High" if 'stress' in symptoms_lower else "Medium",
-                "recommendations": [
+            conditions.append(Condition(
+                name="Tension Headache",
+                description="A common type of headache often caused by stress, muscle tension, or dehydration.",
+                probability="High" if 'stress' in symptoms_lower else "Medium",
+                recommendations=[
                     "Apply cold or warm compress to head and neck",
                     "Practice relaxation techniques",
                     "Stay hydrated and get adequate rest",
                     "Consider over-the-counter pain medication if appropriate"
                 ],
-                "urgency": urgency,
-                "specialty": "Neurology" if urgency == 'Urgent' else None
-            })
-        
-        if any(word in symptoms_lower for word in ['cough', 'cold', 'congestion']):
-            conditions.append({
-                "name": "Upper Respiratory Infection",
-                "description": "A viral infection affecting the nose, throat, and upper airways.",
-                "probability": "High",
-                "recommendations": [
+                urgency=urgency,
+                specialty="Neurology" if urgency == 'Urgent' else None
+            ))
+        
+        if 'respiratory' in demo_groups:
+            conditions.append(Condition(
+                name="Upper Respiratory Infection",
+                description="A viral infection affecting the nose, throat, and upper airways.",
+                probability="High",
+                recommendations=[
                     "Get plenty of rest and stay hydrated",
                     "Use humidifier or breathe steam",
                     "Consider over-the-counter medications for symptom relief",
                     "Avoid contact with others to prevent spread"
-                ],
-                "urgency": "Routine",
-                "specialty": None
-            })
-        
-        if any(word in symptoms_lower for word in ['tired', 'fatigue', 'exhausted']):
-            conditions.append({
-                "name": "General Fatigue",
-                "description": "Feeling of tiredness or lack of energy that can have various underlying causes.",
-                "probability": "Medium",
-                "recommendations": [
+                ]
+            ))
+        
+        if 'fatigue' in demo_groups:
+            conditions.append(Condition(
+                name="General Fatigue",
+                description="Feeling of tiredness or lack of energy that can have various underlying causes.",
+                probability="Medium",
+                recommendations=[
                     "Ensure adequate sleep (7-9 hours per night)",
                     "Maintain balanced diet and regular exercise",
                     "Manage stress levels",
                     "Consider underlying medical conditions if persistent"
-                ],
-                "urgency": "Routine",
-                "specialty": None
-            })
+                ]
+            ))
         
         # Default condition if no specific matches
         if not conditions:
-            conditions.append({
-                "name": "General Health Concern",
-                "description": "Your symptoms require professional medical evaluation for accurate diagnosis.",
-                "probability": "Medium",
-                "recommendations": [
+            conditions.append(Condition(
+                name="General Health Concern",
+                description="Your symptoms require professional medical evaluation for accurate diagnosis.",
+                probability="Medium",
+                recommendations=[
                     "Monitor symptoms and document any changes",
                     "Consult with healthcare professional for proper evaluation",
                     "Seek immediate care if symptoms worsen significantly"
-                ],
-                "urgency": "Routine",
-                "specialty": None
-            })
+                ]
+            ))
+        
+        # The helpers and the response expect plain dicts
+        conditions = [asdict(condition) for condition in conditions]
         
         # Enhanced analysis features
-        emergency_detected = self._detect_emergency_advanced(symptoms, patient_data)
-        specialist_referral = self._suggest_specialist(symptoms, conditions)
-        risk_factors = self._assess_risk_factors(symptoms, patient_data)
+        emergency_detected = self._detect_emergency_advanced(symptoms, patient_data, symptoms_lower)
+        specialist_referral = self._suggest_specialist(symptoms, conditions, symptoms_lower)
+        risk_factors = self._assess_risk_factors(symptoms, patient_data, symptoms_lower)
         follow_up_timeline = self._suggest_follow_up_timeline(conditions)
-        red_flags = self._identify_red_flags(symptoms, patient_data)
+        red_flags = self._identify_red_flags(symptoms, patient_data, symptoms_lower)
         
         return {
             "conditions": conditions,
@@ -2,7 +2,10 @@ import os
 from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
-load_dotenv(os.path.join(basedir, '.env'))
+
+# The explicit path avoids python-dotenv searching up the directory tree;
+# values already set in the environment take precedence over .env
+load_dotenv(os.path.join(basedir, '.env'), override=False)
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -14,5 +17,16 @@ class Config:
     # Rate limiting configuration
     RATELIMIT_STORAGE_URL = "memory://"
     
+    # Build the analyzer at app creation outside debug mode (run.py reads the same DEBUG variable)
+    PRELOAD_ANALYZER = os.environ.get('DEBUG', 'True').lower() != 'true'
+    
     # Request timeout for API calls (seconds)
-    API_TIMEOUT = 30
\ No newline at end of file
+    API_TIMEOUT = 30
+    
+    # Reject oversized request bodies before they are parsed
+    MAX_CONTENT_LENGTH = 32 * 1024
+    
+    # Response compression (Flask-Compress)
+    COMPRESS_MIMETYPES = ['text/html', 'application/json']
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIN_SIZE = 500
\ No newline at end of file
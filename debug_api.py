@@ -107,6 +107,41 @@ def check_flask_app():
         print(f"❌ Flask app test failed: {e}")
         return False
 
+def test_batch_analysis():
+    """Test concurrent batch analysis through the Flask app."""
+    print("\n🔍 Testing Batch Symptom Analysis")
+    print("=" * 40)
+    
+    try:
+        from app import create_app
+        from app.services.symptom_analyzer import SymptomAnalyzer
+        app = create_app()
+        
+        cases = [
+            {"symptoms": "I have a headache and mild fever"},
+            {"symptoms": "Sore throat and runny nose for two days"},
+            {"symptoms": "Stomach ache after eating", "patient_data": {"age_range": "18-30"}}
+        ]
+        
+        with app.app_context():
+            analyzer = SymptomAnalyzer()
+            print(f"🔄 Analyzing {len(cases)} cases concurrently...")
+            results = analyzer.analyze_symptoms_batch(cases)
+        
+        if len(results) != len(cases):
+            print(f"❌ Expected {len(cases)} results, got {len(results)}")
+            return False
+        
+        for case, result in zip(cases, results):
+            conditions = result.get('conditions', [])
+            top = conditions[0].get('name', 'Unknown') if conditions else 'None'
+            print(f"✅ {case['symptoms'][:40]} -> {top}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch analysis failed: {e}")
+        return False
+
 def main():
     """Run all diagnostic tests."""
     print("🏥 Healthcare Symptom Checker - API Diagnostics")
@@ -115,7 +150,8 @@ def main():
     tests = [
         check_environment,
         test_openai_connection,
-        check_flask_app
+        check_flask_app,
+        test_batch_analysis
     ]
     
     all_passed = True
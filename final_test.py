@@ -2,7 +2,6 @@
 """Final test for Healthcare Symptom Checker with real API"""
 
 from app import create_app
-from app.services.symptom_analyzer import SymptomAnalyzer
 
 def test_real_api():
     """Test the symptom analyzer with real API."""
@@ -15,7 +14,8 @@ def test_real_api():
         
         with app.app_context():
             # Test symptom analyzer
-            analyzer = SymptomAnalyzer()
+            from app.services.symptom_analyzer import get_analyzer
+            analyzer = get_analyzer()
             
             # Test with simple symptoms
             test_symptoms = "I have a headache and feel tired for the past 2 days"
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for serving the Healthcare Symptom Checker
+"""
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '127.0.0.1')}:{os.environ.get('PORT', 5000)}"
+
+# Analyses spend their time waiting on OpenAI, so gevent workers keep many
+# requests in flight per process
+worker_class = "gevent"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = 1000
+
+# Allow for slow model responses
+timeout = 120
+
+# Each worker imports the app (and builds its analyzer) once, after gevent has
+# patched it; preloading would create the OpenAI client's SSL context before
+# ssl is patched
+preload_app = False
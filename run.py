@@ -3,12 +3,10 @@
 Healthcare Symptom Checker Application Entry Point
 """
 import os
-from dotenv import load_dotenv
+import sys
 from app import create_app
 
-# Load environment variables from .env file
-load_dotenv()
-
+# Importing the app loads .env through config.py before the settings below are read
 app = create_app()
 
 if __name__ == '__main__':
@@ -17,12 +15,27 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     host = os.environ.get('HOST', '127.0.0.1')
     
-    print(f"Environment PORT: {os.environ.get('PORT', 'Not set')}")
-    print(f"Starting Healthcare Symptom Checker on {host}:{port}")
-    print(f"Debug mode: {debug_mode}")
+    # One write for the banner, flushed so it is not lost when exec replaces the process
+    sys.stdout.write(
+        f"Environment PORT: {os.environ.get('PORT', 'Not set')}\n"
+        f"Starting Healthcare Symptom Checker on {host}:{port}\n"
+        f"Debug mode: {debug_mode}\n"
+    )
+    sys.stdout.flush()
     
-    app.run(
-        host=host,
-        port=port,
-        debug=debug_mode
-    )
\ No newline at end of file
+    if debug_mode:
+        app.run(
+            host=host,
+            port=port,
+            debug=debug_mode
+        )
+    else:
+        # Hand the process over to Gunicorn with gevent workers (see gunicorn.conf.py)
+        basedir = os.path.dirname(os.path.abspath(__file__))
+        os.execvp("gunicorn", [
+            "gunicorn",
+            "--chdir", basedir,
+            "-c", os.path.join(basedir, "gunicorn.conf.py"),
+            "-b", f"{host}:{port}",
+            "run:app"
+        ])
\ No newline at end of file
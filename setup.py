@@ -7,15 +7,17 @@ import sys
 import subprocess
 import shutil
 
-def run_command(command, description):
-    """Run a command and handle errors."""
+def run_command(argv, description):
+    """Run a command given as an argument list and handle errors."""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        # No shell in between, and only stderr is kept for the error message;
+        # it stays bytes and is decoded only if the command fails
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed: {e.stderr}")
+        print(f"❌ {description} failed: {e.stderr.decode('utf-8', 'replace')}")
         return False
 
 def check_python_version():
@@ -32,32 +34,48 @@ def setup_virtual_environment():
         print("📁 Virtual environment already exists")
         return True
     
-    return run_command('python3 -m venv venv', 'Creating virtual environment')
+    return run_command([sys.executable, '-m', 'venv', 'venv'], 'Creating virtual environment')
 
-def install_dependencies():
-    """Install Python dependencies."""
+def start_dependency_install():
+    """Start installing Python dependencies in the background."""
     # Determine the correct pip path
     if os.name == 'nt':  # Windows
         pip_path = 'venv\\Scripts\\pip'
     else:  # macOS/Linux
         pip_path = 'venv/bin/pip'
     
-    return run_command(f'{pip_path} install -r requirements.txt', 'Installing dependencies')
+    print("🔄 Installing dependencies...")
+    # pip's output streams straight to the terminal instead of being buffered
+    env = dict(os.environ, PIP_DISABLE_PIP_VERSION_CHECK='1')
+    return subprocess.Popen([pip_path, 'install', '--prefer-binary', '-r', 'requirements.txt'], env=env)
+
+def finish_dependency_install(process):
+    """Wait for the dependency install started by start_dependency_install."""
+    returncode = process.wait()
+    if returncode != 0:
+        print(f"❌ Installing dependencies failed (pip exited with code {returncode})")
+        return False
+    print("✅ Installing dependencies completed successfully")
+    return True
 
 def setup_environment_file():
     """Set up environment configuration file."""
-    if os.path.exists('.env'):
+    try:
+        os.stat('.env')
         print("📁 .env file already exists")
         return True
+    except FileNotFoundError:
+        pass
     
-    if os.path.exists('.env.example'):
+    try:
         shutil.copy('.env.example', '.env')
-        print("✅ Created .env file from template")
-        print("⚠️  Please edit .env file and add your OpenAI API key")
-        return True
-    else:
+    except FileNotFoundError:
         print("❌ .env.example file not found")
         return False
+    
+    print("✅ Created .env file from template")
+    print("⚠️  Please edit .env file and add your OpenAI API key")
+    return True
 
 def main():
     """Main setup function."""
@@ -72,12 +90,14 @@ def main():
     if not setup_virtual_environment():
         sys.exit(1)
     
-    # Install dependencies
-    if not install_dependencies():
+    # Install dependencies, setting up the environment file while pip runs
+    install = start_dependency_install()
+    env_file_ready = setup_environment_file()
+    
+    if not finish_dependency_install(install):
         sys.exit(1)
     
-    # Set up environment file
-    if not setup_environment_file():
+    if not env_file_ready:
         sys.exit(1)
     
     print("\n🎉 Setup completed successfully!")